@@ -0,0 +1,130 @@
+"""Controlul admiterii conexiunilor, pentru ca serverul să reziste la suprasarcină.
+
+Conexiunile acceptate intră într-o coadă limitată, servită de un număr fix
+de thread-uri. Când coada e plină, când o adresă IP are prea multe
+conexiuni deschise sau depășește rata de cereri, conexiunea primește
+imediat un răspuns "ocupat" și este închisă, fără a consuma un thread.
+"""
+import json
+import queue
+import threading
+import time
+
+# Motivele pentru care o conexiune este refuzată
+QUEUE_FULL = 'queue_full'
+TOO_MANY_CONNECTIONS = 'per_ip_connections'
+RATE_LIMITED = 'per_ip_rate'
+TOO_MANY_SUBSCRIBERS = 'subscribers'
+
+
+def busy_response(reason, retry_after=1):
+    """Răspunsul scurt trimis conexiunilor refuzate."""
+    return json.dumps({'error': 'Server ocupat, reîncercați', 'busy': True,
+                       'reason': reason, 'retry_after': retry_after}).encode()
+
+
+def reject(conn, reason, retry_after=1):
+    """Trimite răspunsul "ocupat" fără a bloca și închide conexiunea."""
+    try:
+        conn.setblocking(False)
+        conn.send(busy_response(reason, retry_after))
+    except OSError:
+        pass
+    finally:
+        conn.close()
+
+
+class AdmissionControl:
+    """Limite per adresă IP: conexiuni simultane și rată de cereri (token bucket).
+
+    `exempt(ip)` poate scuti unele adrese (ex: localhost) de limite.
+    """
+
+    def __init__(self, max_connections_per_ip=16, rate=20.0, burst=40, exempt=None):
+        self.max_connections_per_ip = max_connections_per_ip
+        self.rate = rate
+        self.burst = burst
+        self.exempt = exempt
+        self.connections = {}
+        self.buckets = {}    # ip -> [jetoane, ultima actualizare]
+        self._lock = threading.Lock()
+
+    def _take_token(self, ip, now):
+        bucket = self.buckets.get(ip)
+        if bucket is None:
+            if len(self.buckets) >= 10000:
+                self._prune(now)
+            bucket = self.buckets[ip] = [float(self.burst), now]
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+    def _prune(self, now):
+        # Gălețile care s-ar fi umplut la loc nu mai conțin informație
+        full_after = self.burst / self.rate if self.rate else 0
+        for ip in [ip for ip, (_, last) in self.buckets.items() if now - last >= full_after]:
+            del self.buckets[ip]
+
+    def admit(self, ip):
+        """Înregistrează o conexiune nouă; returnează (motivul refuzului sau None, numărată).
+
+        `numărată` spune dacă apelantul trebuie să apeleze `release` la închidere:
+        scutirea se poate schimba cât timp conexiunea e deschisă (ex: worker
+        înregistrat între timp), deci nu se reevaluează la eliberare.
+        """
+        if self.exempt is not None and self.exempt(ip):
+            return None, False
+        with self._lock:
+            if self.connections.get(ip, 0) >= self.max_connections_per_ip:
+                return TOO_MANY_CONNECTIONS, False
+            if self.rate and not self._take_token(ip, time.monotonic()):
+                return RATE_LIMITED, False
+            self.connections[ip] = self.connections.get(ip, 0) + 1
+        return None, True
+
+    def release(self, ip):
+        """Marchează închiderea unei conexiuni numărate de `admit`."""
+        with self._lock:
+            count = self.connections.get(ip, 0) - 1
+            if count > 0:
+                self.connections[ip] = count
+            else:
+                self.connections.pop(ip, None)
+
+
+class WorkerPool:
+    """Un număr fix de thread-uri care preiau sarcini dintr-o coadă limitată."""
+
+    def __init__(self, handler, workers=32, queue_size=256, name='worker'):
+        self.handler = handler
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.threads = [threading.Thread(target=self._run, name=f"{name}-{index}", daemon=True)
+                        for index in range(workers)]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def submit(self, *args):
+        """Pune sarcina în coadă; returnează False (fără să aștepte) dacă e plină."""
+        try:
+            self.queue.put_nowait(args)
+            return True
+        except queue.Full:
+            return False
+
+    def pending(self):
+        return self.queue.qsize()
+
+    def _run(self):
+        while True:
+            args = self.queue.get()
+            try:
+                self.handler(*args)
+            except Exception as e:
+                print(f"Eroare neprinsă în {threading.current_thread().name}: {e}")
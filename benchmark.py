@@ -0,0 +1,483 @@
+"""Benchmark pentru server cu o fermă locală de feed-uri sintetice.
+
+Pornește un server HTTP local care servește feed-uri RSS/Atom generate,
+rulează calea reală de ingestie (server.update_cycle) și apoi simulează
+clienți concurenți care trimit GET_FEED către server.handle_client.
+
+Exemplu:
+    python benchmark.py --feeds 20 --entries 50 --cycles 5 --clients 20
+
+Cu --sanitize se măsoară doar extragerea rezumatelor text din descrieri HTML:
+    python benchmark.py --sanitize --entries 2000 --description-size 50000
+
+Cu --codec se compară formatul binar (codec.py) cu JSON pentru răspunsul GET_FEED:
+    python benchmark.py --codec
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+import codec
+import protocol
+import sanitize
+import server
+
+
+class MockFeed:
+    """Un feed sintetic; conținutul avansează cu `new_per_cycle` articole la fiecare generație."""
+
+    def __init__(self, index, entries=50, description_size=500, latency=0.0,
+                 failure_rate=0.0, not_modified=False, new_per_cycle=5, fmt='rss'):
+        self.index = index
+        self.entries = entries
+        self.description_size = description_size
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.not_modified = not_modified
+        self.new_per_cycle = new_per_cycle
+        self.fmt = fmt
+        self.generation = 0
+
+    @property
+    def etag(self):
+        # Derivat din conținut: fără articole noi (new_per_cycle=0) rămâne același
+        return f'"{self.index}-{self.generation * self.new_per_cycle}"'
+
+    def _items(self):
+        first = self.generation * self.new_per_cycle
+        filler = ('<p>Lorem ipsum <b>dolor</b> sit amet &amp; consectetur.</p> ' *
+                  (self.description_size // 60 + 1))[:self.description_size]
+        for number in range(first + self.entries - 1, first - 1, -1):
+            published = 1700000000 + number * 60 + self.index
+            yield number, published, filler
+
+    def render(self):
+        """Generează documentul XML al feed-ului pentru generația curentă."""
+        if self.fmt == 'atom':
+            parts = ['<?xml version="1.0" encoding="utf-8"?>',
+                     '<feed xmlns="http://www.w3.org/2005/Atom">',
+                     f'<title>Feed sintetic {self.index}</title>']
+            for number, published, filler in self._items():
+                stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(published))
+                parts.append(
+                    f'<entry><title>Articol {self.index}-{number}</title>'
+                    f'<link href="http://mock/{self.index}/{number}"/>'
+                    f'<id>urn:mock:{self.index}:{number}</id>'
+                    f'<updated>{stamp}</updated>'
+                    f'<summary type="html">{escape(filler)}</summary></entry>')
+            parts.append('</feed>')
+        else:
+            parts = ['<?xml version="1.0" encoding="utf-8"?>',
+                     '<rss version="2.0"><channel>',
+                     f'<title>Feed sintetic {self.index}</title>']
+            for number, published, filler in self._items():
+                parts.append(
+                    f'<item><title>Articol {self.index}-{number}</title>'
+                    f'<link>http://mock/{self.index}/{number}</link>'
+                    f'<pubDate>{formatdate(published, usegmt=True)}</pubDate>'
+                    f'<description>{escape(filler)}</description></item>')
+            parts.append('</channel></rss>')
+        return '\n'.join(parts).encode('utf-8')
+
+
+class MockFeedFarm:
+    """Server HTTP local care servește o colecție de feed-uri sintetice."""
+
+    def __init__(self, feeds, seed=0):
+        self.feeds = feeds
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.failures = 0
+        self.httpd = None
+
+    def start(self):
+        farm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                farm.handle(self)
+
+            def log_message(self, format, *args):
+                pass  # Fără log pe fiecare cerere
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def url_for(self, feed):
+        return f"{self.base_url}/feed/{feed.index}"
+
+    def advance(self):
+        """Publică articole noi în toate feed-urile."""
+        for feed in self.feeds:
+            feed.generation += 1
+
+    def handle(self, request):
+        self.requests += 1
+        try:
+            feed = self.feeds[int(request.path.rsplit('/', 1)[-1])]
+        except (ValueError, IndexError):
+            request.send_error(404)
+            return
+
+        if feed.latency:
+            time.sleep(feed.latency)
+
+        with self.random_lock:
+            failed = self.random.random() < feed.failure_rate
+        if failed:
+            self.failures += 1
+            request.send_error(503)
+            return
+
+        if feed.not_modified and request.headers.get('If-None-Match') == feed.etag:
+            self.not_modified += 1
+            request.send_response(304)
+            request.send_header('ETag', feed.etag)
+            request.end_headers()
+            return
+
+        body = feed.render()
+        request.send_response(200)
+        content_type = 'application/atom+xml' if feed.fmt == 'atom' else 'application/rss+xml'
+        request.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        request.send_header('Content-Length', str(len(body)))
+        if feed.not_modified:
+            request.send_header('ETag', feed.etag)
+        request.end_headers()
+        request.wfile.write(body)
+
+
+def send_command(port, command, timeout=30):
+    """Trimite o comandă serverului și citește răspunsul până la închiderea conexiunii."""
+    with socket.create_connection(('127.0.0.1', port), timeout=timeout) as sock:
+        sock.sendall(command)
+        data = b''
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return data
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """Memoria rezidentă maximă a procesului, în MB (None dacă nu e disponibilă)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss /= 1024  # pe macOS valoarea este în bytes
+    return rss / 1024
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """Ascunde mesajele print ale serverului în timpul măsurătorilor."""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def run_ingest(farm, cycles, settings, verbose=False):
+    """Rulează `cycles` cicluri de ingestie; returnează (durata, articole noi)."""
+    active_feeds = [{'name': f"Mock {feed.index}", 'url': farm.url_for(feed), 'active': True}
+                    for feed in farm.feeds]
+    server.current_config = {'feeds': active_feeds, 'settings': settings}
+
+    total_new = 0
+    start = time.perf_counter()
+    with quiet(not verbose):
+        for _ in range(cycles):
+            total_new += server.update_cycle(active_feeds, settings)
+            farm.advance()
+    return time.perf_counter() - start, total_new
+
+
+def run_clients(port, clients, requests_per_client, command=b'GET_FEED', verbose=False):
+    """Simulează clienți concurenți; returnează latențele (secunde) și numărul de erori."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client_loop():
+        local = []
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            try:
+                data = send_command(port, command)
+                if not data:
+                    raise ValueError('răspuns gol')
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    with quiet(not verbose), ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(clients):
+            pool.submit(client_loop)
+    return latencies, errors[0], time.perf_counter() - start
+
+
+def sample_descriptions(count, size, seed=0):
+    """Descrieri HTML sintetice, cu markup variat (linkuri, imagini, script, entități)."""
+    rng = random.Random(seed)
+    blocks = [
+        '<p>Lorem ipsum <b>dolor</b> sit amet &amp; consectetur adipiscing elit.</p>',
+        '<a href="http://mock/link?a=1&amp;b=2">Citește mai mult</a> ',
+        '<img src="http://mock/img.jpg" alt="imagine" width="640" height="480"/>',
+        '<div class="ad"><script>var x = "<p>reclamă</p>";</script></div>',
+        '<ul><li>Primul punct</li><li>Al doilea &#8211; punct</li></ul>',
+        '<p>Știri din România: președintele a declarat &quot;totul e bine&quot;.</p>\n',
+    ]
+    descriptions = []
+    for _ in range(count):
+        parts, length = [], 0
+        while length < size:
+            block = rng.choice(blocks)
+            parts.append(block)
+            length += len(block)
+        descriptions.append(''.join(parts)[:size])
+    return descriptions
+
+
+def run_sanitize(count, size, summary_length, seed=0):
+    """Măsoară extragerea rezumatelor, comparativ cu conversia întregului HTML."""
+    descriptions = sample_descriptions(count, size, seed)
+    articles = [{'description': description} for description in descriptions]
+    input_mb = sum(len(description) for description in descriptions) / (1024 * 1024)
+
+    start = time.perf_counter()
+    sanitize.summarize_batch(articles, summary_length)
+    summary_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full_texts = [sanitize.html_to_text(description) for description in descriptions]
+    full_seconds = time.perf_counter() - start
+
+    return {
+        'articles': count,
+        'description_size': size,
+        'summary_length': summary_length,
+        'input_mb': input_mb,
+        'articles_per_sec': count / summary_seconds if summary_seconds else 0.0,
+        'input_mb_per_sec': input_mb / summary_seconds if summary_seconds else 0.0,
+        'full_text_articles_per_sec': count / full_seconds if full_seconds else 0.0,
+        'avg_summary_chars': sum(len(article['summary']) for article in articles) / max(1, count),
+        'avg_full_text_chars': sum(len(text) for text in full_texts) / max(1, count),
+    }
+
+
+def sample_articles(count, seed=0):
+    """Articole sintetice ca cele din răspunsul GET_FEED (20 de surse, rezumate de ~300 caractere)."""
+    rng = random.Random(seed)
+    words = ['guvernul', 'piața', 'alegeri', 'economie', 'sport', 'vremea', 'tehnologie', 'Europa',
+             'president', 'market', 'election', 'climate', 'football', 'update', 'report', 'said']
+    articles = []
+    for index in range(count):
+        published_ts = 1700000000 - index * 45 - rng.randint(0, 30)
+        articles.append({
+            'id': 100000 - index,
+            'title': ' '.join(rng.choices(words, k=8)).capitalize(),
+            'link': f"https://news.example.com/{published_ts}/{index}",
+            'published': formatdate(published_ts, usegmt=True),
+            'source': f"Sursa {rng.randrange(20)}",
+            'summary': ' '.join(rng.choices(words, k=40)),
+            'published_ts': published_ts,
+            'cluster_id': 100000 - index - rng.choice((0, 0, 0, 1, 2)),
+        })
+    return articles
+
+
+def _best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_codec(sizes=(50, 1000, 10000), chunk_size=65536, seed=0):
+    """Compară JSON cu formatul binar: dimensiune, codificare și decodare (cel mai bun timp)."""
+    report = {}
+    for count in sizes:
+        articles = sample_articles(count, seed)
+        repeat = max(3, 20000 // count)
+        json_payload = protocol.encode_feed(articles)
+        binary_payload = protocol.encode_feed(articles, binary=True)
+        chunks = [binary_payload[i:i + chunk_size] for i in range(0, len(binary_payload), chunk_size)]
+
+        def decode_incremental():
+            decoder = codec.FeedDecoder()
+            for chunk in chunks:
+                decoder.feed(chunk)
+            return decoder.result()
+
+        assert decode_incremental() == json.loads(json_payload.decode())
+        report[count] = {
+            'json_kb': len(json_payload) / 1024,
+            'binary_kb': len(binary_payload) / 1024,
+            'json_encode_ms': _best_time(lambda: protocol.encode_feed(articles), repeat) * 1000,
+            'binary_encode_ms': _best_time(lambda: protocol.encode_feed(articles, binary=True), repeat) * 1000,
+            'json_decode_ms': _best_time(lambda: json.loads(json_payload.decode()), repeat) * 1000,
+            'binary_decode_ms': _best_time(decode_incremental, repeat) * 1000,
+        }
+    return report
+
+
+def print_codec_report(report, as_json=False):
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+    columns = list(next(iter(report.values())))
+    print("=== JSON vs BINAR (GET_FEED) ===")
+    print(f"{'articole':>10}" + ''.join(f"{column:>18}" for column in columns))
+    for count, row in report.items():
+        print(f"{count:>10}" + ''.join(f"{row[column]:>18.2f}" for column in columns))
+
+
+def print_report(report, as_json=False):
+    if as_json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("=== REZULTATE BENCHMARK ===")
+        for key, value in report.items():
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            print(f"{key:>26}: {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark local pentru serverul RSS")
+    parser.add_argument('--feeds', type=int, default=20, help="numărul de feed-uri sintetice")
+    parser.add_argument('--entries', type=int, default=50, help="articole per feed")
+    parser.add_argument('--description-size', type=int, default=500, help="lungimea descrierii (caractere)")
+    parser.add_argument('--latency', type=float, default=0.0, help="latența artificială per cerere HTTP (s)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fracțiunea de cereri care eșuează cu 503")
+    parser.add_argument('--not-modified', action='store_true', help="feed-urile răspund cu 304 la ETag identic")
+    parser.add_argument('--new-per-cycle', type=int, default=5, help="articole noi per feed la fiecare ciclu")
+    parser.add_argument('--cycles', type=int, default=5, help="cicluri de ingestie")
+    parser.add_argument('--clients', type=int, default=20, help="clienți concurenți")
+    parser.add_argument('--requests', type=int, default=50, help="cereri per client")
+    parser.add_argument('--backend', choices=('sqlite', 'memory'), default='sqlite',
+                        help="backend-ul de stocare a articolelor")
+    parser.add_argument('--sanitize', action='store_true',
+                        help="măsoară doar extragerea rezumatelor (--entries descrieri de --description-size)")
+    parser.add_argument('--codec', action='store_true',
+                        help="compară formatul binar cu JSON la 50, 1000 și 10000 de articole")
+    parser.add_argument('--summary-length', type=int, default=sanitize.SUMMARY_LENGTH,
+                        help="lungimea rezumatului text (caractere)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="afișează raportul ca JSON")
+    parser.add_argument('--verbose', action='store_true', help="păstrează mesajele serverului")
+    args = parser.parse_args(argv)
+
+    if args.codec:
+        report = run_codec(seed=args.seed)
+        print_codec_report(report, args.json)
+        return report
+
+    if args.sanitize:
+        report = run_sanitize(args.entries, args.description_size, args.summary_length, args.seed)
+        print_report(report, args.json)
+        return report
+
+    feeds = [MockFeed(i, entries=args.entries, description_size=args.description_size,
+                      latency=args.latency, failure_rate=args.failure_rate,
+                      not_modified=args.not_modified, new_per_cycle=args.new_per_cycle,
+                      fmt='atom' if i % 2 else 'rss')
+             for i in range(args.feeds)]
+    farm = MockFeedFarm(feeds, seed=args.seed).start()
+
+    workdir = tempfile.mkdtemp(prefix='rss_bench_')
+    server.DB_FILE = os.path.join(workdir, 'bench.db')
+    settings = {'update_interval': 300, 'max_articles_per_feed': args.entries, 'request_timeout': 15,
+                'storage_backend': args.backend, 'summary_length': args.summary_length}
+    server.current_config = {'feeds': [], 'settings': settings}
+
+    try:
+        with quiet(not args.verbose):
+            server.init_db()
+        ingest_seconds, total_new = run_ingest(farm, args.cycles, settings, args.verbose)
+
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(128)
+        port = listener.getsockname()[1]
+        threading.Thread(target=server.serve, args=(listener,), daemon=True).start()
+
+        latencies, errors, client_seconds = run_clients(port, args.clients, args.requests,
+                                                        verbose=args.verbose)
+        listener.close()
+
+        report = {
+            'feeds': args.feeds,
+            'cycles': args.cycles,
+            'cycles_per_sec': args.cycles / ingest_seconds if ingest_seconds else 0.0,
+            'articles_inserted': total_new,
+            'articles_per_sec': total_new / ingest_seconds if ingest_seconds else 0.0,
+            'http_requests': farm.requests,
+            'http_not_modified': farm.not_modified,
+            'http_failures': farm.failures,
+            'client_requests': len(latencies),
+            'client_errors': errors,
+            'requests_per_sec': len(latencies) / client_seconds if client_seconds else 0.0,
+            'latency_p50_ms': percentile(latencies, 0.50) * 1000,
+            'latency_p99_ms': percentile(latencies, 0.99) * 1000,
+            'peak_rss_mb': peak_rss_mb(),
+            'db_size_kb': (os.path.getsize(server.DB_FILE) / 1024
+                           if os.path.exists(server.DB_FILE) else 0.0),
+        }
+    finally:
+        farm.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(report, args.json)
+    return report
+
+
+if __name__ == '__main__':
+    main()
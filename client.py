@@ -1,4 +1,5 @@
 import socket
+import sys
 import json
 import time
 import curses
@@ -6,24 +7,42 @@ import webbrowser
 import textwrap
 from datetime import datetime
 
+import codec
+
 SERVER_HOST = '127.0.0.1'  
 SERVER_PORT = 5000         
 REFRESH_INTERVAL = 60      
+MAX_ARTICLES = 5000  # Câte articole păstrează clientul în memorie între reîmprospătări
+FEED_FILTER = None  # Numele unui filtru de pe server (python client.py <filtru>)
 
 
-def fetch_feed():
+def request_articles(command):
     """
-    Se conectează la server și primește ultimele știri în format JSON.
+    Trimite comanda și primește lista de articole (format binar sau JSON).
     """
     try:
         with socket.create_connection((SERVER_HOST, SERVER_PORT), timeout=5) as sock:
-            sock.sendall(b'GET_FEED')
+            sock.sendall(command.encode())
             data = b''
+            decoder = None
             while True:
-                chunk = sock.recv(4096)
+                chunk = sock.recv(65536)
                 if not chunk:
                     break
+                if decoder is not None:
+                    # Blocurile complete sunt decodate pe măsură ce sosesc
+                    decoder.feed(chunk)
+                    continue
                 data += chunk
+                if data.startswith(codec.MAGIC):
+                    decoder = codec.FeedDecoder()
+                    decoder.feed(data)
+            
+            if decoder is not None:
+                try:
+                    return decoder.result()
+                except codec.CodecError as e:
+                    return {'error': f'Răspuns binar invalid: {e}'}
             
             # Verifică dacă avem date
             if not data:
@@ -43,6 +62,112 @@ def fetch_feed():
         return {'error': f'Eroare neașteptată: {e}'}
 
 
+# Devine False dacă serverul nu cunoaște formatul binar (răspunde "Comanda necunoscută")
+binary_supported = True
+
+
+def fetch_feed():
+    """
+    Se conectează la server și primește ultimele știri.
+    
+    Cere formatul binar ('BIN'); serverele mai vechi refuză comanda cu argumentul
+    necunoscut, caz în care cererea se repetă (și de acum se trimite) fără 'BIN'.
+    """
+    global binary_supported
+    
+    command = f'GET_FILTERED {FEED_FILTER}' if FEED_FILTER else 'GET_FEED'
+    if binary_supported:
+        response = request_articles(f'{command} BIN')
+        if response.get('error') != 'Comanda necunoscută':
+            return response
+        binary_supported = False
+    return request_articles(command)
+
+
+class ArticleRecord:
+    """Un articol păstrat de client: câmpuri fixe (__slots__), fără dicționar per obiect."""
+    
+    __slots__ = ('key', 'title', 'link', 'published', 'source', 'summary', 'published_ts', 'cluster_id')
+    
+    def __init__(self, key, data):
+        self.key = key
+        self.update(data)
+    
+    def update(self, data):
+        self.title = data.get('title')
+        self.link = data.get('link')
+        self.published = data.get('published')
+        # Numele surselor se repetă: o singură copie a fiecărui șir
+        source = data.get('source')
+        self.source = sys.intern(source) if isinstance(source, str) else source
+        # Serverele mai vechi trimit descrierea completă în loc de rezumat
+        self.summary = data.get('summary') or data.get('description')
+        self.published_ts = data.get('published_ts')
+        self.cluster_id = data.get('cluster_id')
+    
+    def get(self, field, default=None):
+        """Acces ca la un dicționar, pentru funcțiile de afișare."""
+        value = getattr(self, field, None)
+        return default if value is None else value
+    
+    def sort_key(self):
+        published_ts = self.published_ts if isinstance(self.published_ts, int) else 0
+        return (published_ts, self.key if isinstance(self.key, int) else 0)
+
+
+class ArticleBuffer:
+    """Articolele clientului, limitate la `max_size`, cele mai noi primele.
+    
+    Răspunsurile noi sunt combinate cu cele existente: articolele deja
+    cunoscute sunt actualizate pe loc, iar când se depășește limita sunt
+    eliminate cele mai vechi. Căutarea după id și poziția unui id în listă
+    sunt O(1), ca selecția să rămână pe același articol după combinare.
+    """
+    
+    def __init__(self, max_size=MAX_ARTICLES):
+        self.max_size = max_size
+        self._by_key = {}
+        self._order = []
+        self._positions = {}
+    
+    @staticmethod
+    def key_for(data):
+        # Serverele mai vechi nu trimit id: linkul identifică articolul
+        return data.get('id', data.get('link'))
+    
+    def merge(self, items):
+        """Adaugă/actualizează articolele primite; returnează numărul celor noi."""
+        added = 0
+        for data in items:
+            key = self.key_for(data)
+            record = self._by_key.get(key)
+            if record is None:
+                self._by_key[key] = ArticleRecord(key, data)
+                added += 1
+            else:
+                record.update(data)
+        
+        self._order = sorted(self._by_key.values(), key=ArticleRecord.sort_key, reverse=True)
+        for record in self._order[self.max_size:]:
+            del self._by_key[record.key]
+        del self._order[self.max_size:]
+        self._positions = {record.key: index for index, record in enumerate(self._order)}
+        return added
+    
+    def get(self, key):
+        return self._by_key.get(key)
+    
+    def index_of(self, key):
+        """Poziția articolului în listă (None dacă a fost eliminat)."""
+        return self._positions.get(key)
+    
+    def __len__(self):
+        return len(self._order)
+    
+    def __getitem__(self, index):
+        return self._order[index]
+
+
 def format_published_date(date_str):
     """Formatează data de publicare într-un format mai lizibil."""
     try:
@@ -59,6 +184,14 @@ def format_published_date(date_str):
         return "Data necunoscută"
 
 
+def format_article_date(article):
+    """Data articolului: folosește published_ts (epoch) trimis de server, altfel parsează textul."""
+    published_ts = article.get('published_ts')
+    if isinstance(published_ts, int):
+        return datetime.fromtimestamp(published_ts).strftime('%d.%m.%Y %H:%M')
+    return format_published_date(article.get('published', ''))
+
+
 def wrap_text(text, width):
     """Împarte textul în linii de lățimea specificată."""
     return textwrap.fill(text, width=width, break_long_words=False, break_on_hyphens=False)
@@ -142,7 +275,7 @@ def draw_article_list(stdscr, articles, selected_index, scroll_offset):
             # Pregătește textul pentru afișare
             source = article.get('source', 'Necunoscut')
             title = article.get('title', 'Fără titlu')
-            date = format_published_date(article.get('published', ''))
+            date = format_article_date(article)
             
             # Formatează linia
             prefix = f"[{source}] "
@@ -202,7 +335,7 @@ def draw_article_detail(stdscr, article):
         
         # Informații despre articol
         source = article.get('source', 'Necunoscut')
-        date = format_published_date(article.get('published', ''))
+        date = format_article_date(article)
         info_line = f"Sursa: {source} | Data: {date}"
         
         if y_pos < max_y - 2:
@@ -226,8 +359,9 @@ def draw_article_detail(stdscr, article):
             stdscr.addstr(y_pos, 2, separator)
             y_pos += 1
         
-        # Descriere (dacă există)
-        description = article.get('description', 'Nu este disponibilă o descriere.')
+        # Rezumatul text (serverele mai vechi trimit doar descrierea)
+        description = (article.get('summary') or article.get('description')
+                       or 'Nu este disponibilă o descriere.')
         if y_pos < max_y - 2:
             wrapped_desc = wrap_text(description, content_width)
             for line in wrapped_desc.split('\n'):
@@ -266,7 +400,8 @@ def main(stdscr):
     scroll_offset = 0
     current_mode = "list"  # "list" sau "detail"
     current_article = None
-    articles = []
+    articles = ArticleBuffer(MAX_ARTICLES)
+    feed_data = {}
     last_refresh = 0
     
     while True:
@@ -276,10 +411,15 @@ def main(stdscr):
         if current_time - last_refresh > REFRESH_INTERVAL or not articles:
             feed_data = fetch_feed()
             if 'articles' in feed_data:
-                articles = feed_data['articles']
+                # Păstrează selecția pe același articol după combinare
+                selected_key = articles[selected_index].key if selected_index < len(articles) else None
+                articles.merge(feed_data['articles'])
                 last_refresh = current_time
-                # Resetează selecția dacă depășește numărul de articole
-                if selected_index >= len(articles):
+                position = articles.index_of(selected_key)
+                if position is not None:
+                    scroll_offset = max(0, scroll_offset + position - selected_index)
+                    selected_index = position
+                elif selected_index >= len(articles):
                     selected_index = max(0, len(articles) - 1)
         
         # Curăță ecranul
@@ -355,8 +495,8 @@ def main(stdscr):
                 elif key == ord('o') or key == ord('O'):  # Deschide link
                     if current_article and current_article.get('link'):
                         try:
-                            webbrowser.open(current_article['link'])
-                        except:
+                            webbrowser.open(current_article.get('link'))
+                        except webbrowser.Error:
                             pass  # Ignoră erorile la deschiderea browser-ului
         
         except curses.error:
@@ -364,4 +504,6 @@ def main(stdscr):
 
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        FEED_FILTER = sys.argv[1]
     curses.wrapper(main)
\ No newline at end of file
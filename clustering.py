@@ -0,0 +1,184 @@
+"""Gruparea articolelor care descriu aceeași știre din surse diferite.
+
+Fiecare articol primește o semnătură MinHash peste cuvintele normalizate din
+titlu și începutul descrierii. Semnătura este împărțită în benzi (LSH):
+două articole devin candidați doar dacă au cel puțin o bandă identică, deci
+costul unei căutări nu crește cu mărimea tabelei. Candidații sunt apoi
+verificați cu similaritatea Jaccard estimată din semnături.
+"""
+import functools
+import hashlib
+import re
+import struct
+import threading
+import unicodedata
+from collections import OrderedDict
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\w+')
+
+# Cuvinte prea frecvente pentru a diferenția știrile (engleză și română)
+STOPWORDS = frozenset('''
+a an and are as at be by for from has have he in is it its of on or that the their this to was
+were will with after over new says said
+si sa se la in de cu pe din un o ca care mai nu este sunt a au fost pentru
+'''.split())
+
+
+def normalize(text):
+    """Textul cu litere mici și fără diacritice (ș -> s, ă -> a)."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokens(title, description, description_words=30):
+    """Mulțimea cuvintelor semnificative din titlu și începutul descrierii."""
+    text = normalize(f"{title or ''} {_TAG_RE.sub(' ', description or '')}")
+    words = _WORD_RE.findall(text)
+    title_words = len(_WORD_RE.findall(title or ''))
+    words = words[:title_words + description_words]
+    return {word for word in words if len(word) > 2 and word not in STOPWORDS}
+
+
+class MinHasher:
+    """Semnături MinHash cu `num_perm` funcții de hash independente.
+
+    Valorile pentru un cuvânt vin din digest-uri blake2b cu sare diferită
+    (16 valori de 32 de biți per digest) și sunt memorate, deoarece
+    vocabularul știrilor se repetă mult.
+    """
+
+    def __init__(self, num_perm=64, cache_size=100000):
+        if num_perm % 16:
+            raise ValueError("num_perm trebuie să fie multiplu de 16")
+        self.num_perm = num_perm
+        self._salts = [i.to_bytes(2, 'big') for i in range(num_perm // 16)]
+        self._unpack = struct.Struct('<16I').unpack
+        self._word_hashes = functools.lru_cache(maxsize=cache_size)(self._hash_word)
+
+    def _hash_word(self, word):
+        data = word.encode()
+        values = ()
+        for salt in self._salts:
+            values += self._unpack(hashlib.blake2b(data, digest_size=64, salt=salt).digest())
+        return values
+
+    def signature(self, words):
+        if not words:
+            return None
+        # Minimul pe fiecare poziție, peste toate cuvintele
+        return tuple(map(min, zip(*map(self._word_hashes, words))))
+
+
+def similarity(sig_a, sig_b):
+    """Similaritatea Jaccard estimată din două semnături."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class ClusterIndex:
+    """Index LSH peste ultimele `capacity` articole, pentru atribuirea cluster_id.
+
+    Un articol nou primește cluster_id-ul celui mai asemănător articol indexat
+    (dacă similaritatea depășește `threshold`), altfel își începe propriul
+    cluster (cluster_id = id-ul lui).
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.5, capacity=20000):
+        if num_perm % bands:
+            raise ValueError("num_perm trebuie să fie multiplu de bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.capacity = capacity
+        self.entries = OrderedDict()   # id -> (semnătură, cluster_id)
+        self.buckets = {}              # (bandă, valori) -> set de id-uri
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._loaded.set()
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _insert(self, article_id, signature, cluster_id):
+        self.entries[article_id] = (signature, cluster_id)
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, set()).add(article_id)
+        while len(self.entries) > self.capacity:
+            old_id, (old_signature, _) = self.entries.popitem(last=False)
+            for key in self._band_keys(old_signature):
+                bucket = self.buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(old_id)
+                    if not bucket:
+                        del self.buckets[key]
+
+    def _find(self, signature):
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+        best_cluster, best_score = None, self.threshold
+        for candidate in candidates:
+            candidate_signature, cluster_id = self.entries[candidate]
+            score = similarity(signature, candidate_signature)
+            if score >= best_score:
+                best_cluster, best_score = cluster_id, score
+        return best_cluster
+
+    def _signature(self, article):
+        # Rezumatul e deja text simplu; descrierea HTML rămâne pentru articolele fără rezumat
+        return self.hasher.signature(tokens(article['title'], article.get('summary') or article.get('description')))
+
+    def load(self, articles):
+        """Reconstruiește indexul din articole care au deja cluster_id (ex: la pornire)."""
+        with self._lock:
+            for article in sorted(articles, key=lambda item: item['id']):
+                signature = self._signature(article)
+                if signature is not None:
+                    self._insert(article['id'], signature, article.get('cluster_id') or article['id'])
+
+    def load_in_background(self, articles):
+        """Ca `load`, dar într-un thread separat; `assign` așteaptă terminarea lui."""
+        self._loaded.clear()
+
+        def run():
+            try:
+                self.load(articles)
+            finally:
+                self._loaded.set()
+
+        thread = threading.Thread(target=run, name='cluster-load', daemon=True)
+        thread.start()
+        return thread
+
+    def assign(self, articles):
+        """Atribuie cluster_id articolelor noi; returnează lista de perechi (id, cluster_id)."""
+        # Semnăturile se calculează în afara lock-ului
+        signatures = [self._signature(article) for article in articles]
+        self._loaded.wait()
+        assignments = []
+        with self._lock:
+            for article, signature in zip(articles, signatures):
+                cluster_id = article['id']
+                if signature is not None:
+                    cluster_id = self._find(signature) or article['id']
+                    self._insert(article['id'], signature, cluster_id)
+                article['cluster_id'] = cluster_id
+                assignments.append((article['id'], cluster_id))
+        return assignments
+
+
+def collapse(articles, limit):
+    """Păstrează câte un reprezentant per cluster (primul din listă).
+
+    Reprezentantul primește 'related' = numărul celorlalte articole din același
+    cluster găsite în listă.
+    """
+    representatives = OrderedDict()
+    for article in articles:
+        cluster_id = article.get('cluster_id') or article['id']
+        if cluster_id in representatives:
+            representatives[cluster_id]['related'] += 1
+        elif len(representatives) < limit:
+            representatives[cluster_id] = dict(article, related=0)
+    return list(representatives.values())
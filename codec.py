@@ -0,0 +1,283 @@
+"""Codificare binară, pe coloane, pentru răspunsurile cu liste de articole.
+
+Alternativă la JSON, cerută de client cu argumentul 'BIN' (ex: 'GET_FEED BIN').
+Numele câmpurilor apar o singură dată (în schemă), sursele sunt indici într-un
+tabel de șiruri per răspuns, iar întregii (id, published_ts) sunt codificați
+ca diferențe față de valoarea anterioară, pe cât mai puțini octeți.
+
+Format (little-endian):
+
+    MAGIC
+    u32 lungime | antet: u16 câmpuri, (u8 tip, u8 lungime, nume) per câmp,
+                  u32 rânduri, tabelul de șiruri (coloană 's')
+    u32 lungime | bloc: u32 rânduri, apoi câte o coloană per câmp
+    ...
+    u32 0       | sfârșit
+
+Fiecare secțiune are lungimea în față, deci FeedDecoder poate decoda blocurile
+pe măsură ce sosesc octeții, fără să aștepte tot răspunsul.
+"""
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+MAGIC = b'RSB1'
+BLOCK_ROWS = 512
+
+# Tipurile coloanelor
+STRING = ord('s')
+TABLE = ord('t')     # indice în tabelul de șiruri al răspunsului
+INTEGER = ord('i')
+
+# Câmpurile cu valori repetate sau numerice; restul sunt șiruri
+FIELD_TYPES = {'source': TABLE, 'id': INTEGER, 'published_ts': INTEGER, 'cluster_id': INTEGER,
+               'related': INTEGER}
+
+_WIDTHS = (('b', 0x7f), ('h', 0x7fff), ('i', 0x7fffffff), ('q', 0x7fffffffffffffff))
+_U32 = struct.Struct('<I')
+_U16 = struct.Struct('<H')
+_Q = struct.Struct('<q')
+_SWAP = sys.byteorder == 'big'
+
+
+class CodecError(ValueError):
+    """Datele binare nu respectă formatul."""
+
+
+def _pack_ints(values):
+    """Întregi cu semn, pe lățimea minimă: cod de tip + octeți."""
+    limit = max(map(abs, values), default=0)
+    for code, maximum in _WIDTHS:
+        if limit <= maximum:
+            break
+    packed = array(code, values)
+    if _SWAP:
+        packed.byteswap()
+    return code.encode() + packed.tobytes()
+
+
+def _unpack_ints(data, pos, count):
+    code = chr(data[pos])
+    values = array(code)
+    end = pos + 1 + values.itemsize * count
+    values.frombytes(data[pos + 1:end])
+    if _SWAP:
+        values.byteswap()
+    return values, end
+
+
+def _encode_strings(values):
+    # Lungimile în caractere (-1 = None) și un singur bloc UTF-8
+    lengths = [-1 if value is None else len(value) for value in values]
+    blob = ''.join(value for value in values if value is not None).encode('utf-8')
+    return _pack_ints(lengths) + _U32.pack(len(blob)) + blob
+
+
+def _decode_strings(data, pos, count):
+    lengths, pos = _unpack_ints(data, pos, count)
+    size, = _U32.unpack_from(data, pos)
+    pos += 4
+    text = data[pos:pos + size].decode('utf-8')
+    values = []
+    offset = 0
+    for length in lengths:
+        if length < 0:
+            values.append(None)
+        else:
+            values.append(text[offset:offset + length])
+            offset += length
+    return values, pos + size
+
+
+def _encode_ints(values):
+    present = [value for value in values if value is not None]
+    if len(present) != len(values):
+        mask = bytes(value is not None for value in values)
+    else:
+        mask = b''
+    if any(not isinstance(value, int) for value in present):
+        raise CodecError("Coloană numerică cu valori care nu sunt întregi")
+    base = present[0] if present else 0
+    deltas = [0] + [current - previous for previous, current in zip(present, present[1:])]
+    return (bytes((1 if mask else 0,)) + mask + _Q.pack(base)
+            + _U32.pack(len(present)) + _pack_ints(deltas))
+
+
+def _decode_ints(data, pos, count):
+    has_mask = data[pos]
+    pos += 1
+    mask = None
+    if has_mask:
+        mask = data[pos:pos + count]
+        pos += count
+    base, = _Q.unpack_from(data, pos)
+    present, = _U32.unpack_from(data, pos + 8)
+    deltas, pos = _unpack_ints(data, pos + 12, present)
+    # deltas[0] este 0, deci primul element după `initial` este chiar baza
+    values = list(accumulate(deltas, initial=base))[1:]
+    if mask is None:
+        return values, pos
+    it = iter(values)
+    return [next(it) if flag else None for flag in mask], pos
+
+
+def encode_feed(articles, fields):
+    """Serializează articolele (dicționare) cu câmpurile date."""
+    types = [FIELD_TYPES.get(field, STRING) for field in fields]
+
+    # Tabelul de șiruri, comun pentru tot răspunsul
+    table = {}
+    for field, kind in zip(fields, types):
+        if kind == TABLE:
+            for article in articles:
+                value = article.get(field)
+                if value is not None and value not in table:
+                    table[value] = len(table)
+
+    header = [_U16.pack(len(fields))]
+    for field, kind in zip(fields, types):
+        name = field.encode()
+        header.append(bytes((kind, len(name))) + name)
+    header.append(_U32.pack(len(articles)))
+    header.append(_U32.pack(len(table)) + _encode_strings(list(table)))
+    header = b''.join(header)
+
+    parts = [MAGIC, _U32.pack(len(header)), header]
+    for start in range(0, len(articles), BLOCK_ROWS):
+        rows = articles[start:start + BLOCK_ROWS]
+        block = [_U32.pack(len(rows))]
+        for field, kind in zip(fields, types):
+            values = [article.get(field) for article in rows]
+            if kind == INTEGER:
+                block.append(_encode_ints(values))
+            elif kind == TABLE:
+                block.append(_pack_ints([-1 if value is None else table[value] for value in values]))
+            else:
+                block.append(_encode_strings(values))
+        block = b''.join(block)
+        parts.append(_U32.pack(len(block)))
+        parts.append(block)
+    parts.append(_U32.pack(0))
+    return b''.join(parts)
+
+
+class FeedDecoder:
+    """Decodor incremental: `feed(octeți)` întoarce articolele din blocurile complete."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.fields = None
+        self.types = None
+        self.table = None
+        self.total = None
+        self.articles = []
+        self.done = False
+        self._magic_checked = False
+
+    def _section(self):
+        # O secțiune completă (fără prefixul de lungime) sau None dacă nu a sosit
+        if len(self.buffer) < 4:
+            return None
+        size, = _U32.unpack_from(self.buffer, 0)
+        if len(self.buffer) < 4 + size:
+            return None
+        section = bytes(self.buffer[4:4 + size])
+        del self.buffer[:4 + size]
+        return section
+
+    def _read_header(self, data):
+        count, = _U16.unpack_from(data, 0)
+        pos = 2
+        self.fields, self.types = [], []
+        for _ in range(count):
+            kind, length = data[pos], data[pos + 1]
+            self.fields.append(data[pos + 2:pos + 2 + length].decode())
+            self.types.append(kind)
+            pos += 2 + length
+        self.total, entries = struct.unpack_from('<II', data, pos)
+        self.table, _ = _decode_strings(data, pos + 8, entries)
+
+    def _read_block(self, data):
+        rows, = _U32.unpack_from(data, 0)
+        pos = 4
+        columns = []
+        for kind in self.types:
+            if kind == INTEGER:
+                values, pos = _decode_ints(data, pos, rows)
+            elif kind == TABLE:
+                indices, pos = _unpack_ints(data, pos, rows)
+                values = [None if index < 0 else self.table[index] for index in indices]
+            elif kind == STRING:
+                values, pos = _decode_strings(data, pos, rows)
+            else:
+                raise CodecError(f"Tip de coloană necunoscut: {kind}")
+            columns.append(values)
+        return [dict(zip(self.fields, row)) for row in zip(*columns)]
+
+    def feed(self, chunk):
+        """Adaugă octeți; returnează lista articolelor decodate acum (poate fi goală)."""
+        if self.done:
+            return []
+        self.buffer += chunk
+        if not self._magic_checked:
+            if len(self.buffer) < len(MAGIC):
+                return []
+            if self.buffer[:len(MAGIC)] != MAGIC:
+                raise CodecError("Răspunsul nu este în formatul binar")
+            del self.buffer[:len(MAGIC)]
+            self._magic_checked = True
+
+        decoded = []
+        while not self.done:
+            if self.fields is None:
+                header = self._section()
+                if header is None:
+                    break
+                self._read_header(header)
+                continue
+            block = self._section()
+            if block is None:
+                break
+            if not block:
+                self.done = True
+                break
+            try:
+                decoded.extend(self._read_block(block))
+            except (struct.error, IndexError, UnicodeDecodeError) as e:
+                raise CodecError(f"Bloc invalid: {e}") from e
+        self.articles.extend(decoded)
+        return decoded
+
+    def result(self):
+        """Răspunsul complet, în aceeași formă ca varianta JSON."""
+        if not self.done:
+            raise CodecError("Răspuns binar incomplet")
+        return {'articles': self.articles}
+
+
+def decode_feed(data):
+    """Decodează un răspuns binar complet."""
+    decoder = FeedDecoder()
+    decoder.feed(data)
+    return decoder.result()
+
+
+def iter_articles(stream, chunk_size=65536):
+    """Articolele dintr-un flux cu mai multe răspunsuri binare consecutive (ex: export).
+
+    Memoria folosită este cea a unui singur bloc.
+    """
+    decoder = FeedDecoder()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        while chunk:
+            yield from decoder.feed(chunk)
+            if not decoder.done:
+                break
+            # Octeții rămași aparțin răspunsului următor
+            chunk, decoder = bytes(decoder.buffer), FeedDecoder()
+    if decoder.fields is not None and not decoder.done:
+        raise CodecError("Flux binar incomplet")
@@ -0,0 +1,142 @@
+"""Citirea și scrierea fișierului de configurare, comune pentru server și manage_feeds.
+
+Scrierile sunt atomice (fișier temporar + redenumire) și serializate printr-un
+lock consultativ pe `<fișier>.lock`, astfel încât cititorii nu văd niciodată
+un fișier scris pe jumătate. `update()` ține lock-ul pe toată secvența
+citire-modificare-scriere.
+"""
+import contextlib
+import json
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Versiunea curentă a schemei configurației
+SCHEMA_VERSION = 1
+
+
+class ConfigError(Exception):
+    """Fișierul de configurare nu poate fi citit sau nu este valid."""
+
+
+def validate_config(config):
+    """Validează structura configurației."""
+    try:
+        # Verifică structura de bază
+        if not isinstance(config, dict):
+            return False
+
+        if 'feeds' not in config or 'settings' not in config:
+            return False
+
+        if not isinstance(config['feeds'], list):
+            return False
+
+        # Verifică fiecare feed
+        for feed in config['feeds']:
+            if not isinstance(feed, dict):
+                return False
+
+            required_keys = ['name', 'url', 'active']
+            if not all(key in feed for key in required_keys):
+                return False
+
+        return True
+
+    except Exception:
+        return False
+
+
+def _migrate(config):
+    """Aduce configurația la SCHEMA_VERSION."""
+    version = config.get('version', 0)
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        raise ConfigError(f"Versiune de configurație necunoscută: {version}")
+
+    if version < 1:
+        # v0 -> v1: doar adaugă câmpul 'version'
+        config['version'] = 1
+    return config
+
+
+@contextlib.contextmanager
+def locked(path):
+    """Lock exclusiv (consultativ) pentru scrierile în fișierul de configurare."""
+    with open(path + '.lock', 'a+') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def load_config(path):
+    """Citește și validează configurația; ridică ConfigError dacă nu e validă."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Nu pot citi {path}: {e}") from e
+
+    if not validate_config(config):
+        raise ConfigError(f"Structura configurației din {path} nu este validă")
+    return _migrate(config)
+
+
+def _write(path, config):
+    # Apelată sub lock: fișier temporar în același director, apoi redenumire
+    config = dict(config, version=SCHEMA_VERSION)
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creează fișierul cu 0600; păstrează drepturile fișierului înlocuit
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    return config
+
+
+def save_config(path, config):
+    """Scrie configurația atomic: fișier temporar în același director, apoi redenumire."""
+    with locked(path):
+        return _write(path, config)
+
+
+def update(path, change):
+    """Citește, modifică și scrie configurația sub același lock.
+
+    `change(config)` modifică dicționarul primit și returnează o valoare
+    adevărată dacă trebuie salvat; rezultatul lui este returnat. Astfel
+    modificările concurente (alt proces manage_feeds, alt import) nu se
+    suprascriu între ele.
+    """
+    with locked(path):
+        config = load_config(path)
+        result = change(config)
+        if result:
+            _write(path, config)
+    return result
@@ -0,0 +1,117 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# Constante inotify (vezi <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class ConfigWatcher:
+    """Urmărește fișierul de configurare și apelează `callback` la modificări.
+
+    Pe Linux folosește inotify pe directorul fișierului (prinde și scrierile
+    atomice prin redenumire); pe alte sisteme verifică periodic mtime/size.
+    Evenimentele apropiate sunt grupate (debounce) într-un singur apel.
+    """
+
+    def __init__(self, path, callback, poll_interval=2.0, debounce=0.2):
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.mode = None
+        self._stop = threading.Event()
+
+    def start(self):
+        fd = self._init_inotify()
+        if fd is not None:
+            self.mode = 'inotify'
+            target = self._run_inotify
+            args = (fd,)
+        else:
+            self.mode = 'polling'
+            target = self._run_polling
+            args = ()
+        threading.Thread(target=target, args=args, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _notify(self):
+        try:
+            self.callback()
+        except Exception as e:
+            print(f"Eroare la reîncărcarea configurației: {e}")
+
+    def _init_inotify(self):
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(IN_CLOEXEC)
+            if fd < 0:
+                return None
+            directory = os.path.dirname(self.path).encode()
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+            if libc.inotify_add_watch(fd, directory, mask) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def _run_inotify(self, fd):
+        name = os.path.basename(self.path).encode()
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select([fd], [], [], 1.0)
+                if not readable:
+                    continue
+                if not self._matches(os.read(fd, 65536), name):
+                    continue
+                # Așteaptă să se termine rafala de evenimente (scriere + redenumire)
+                while select.select([fd], [], [], self.debounce)[0]:
+                    os.read(fd, 65536)
+                self._notify()
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _matches(data, name):
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            event_name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if event_name == name:
+                return True
+        return False
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _run_polling(self):
+        last = self._signature()
+        while not self._stop.wait(self.poll_interval):
+            current = self._signature()
+            if current != last:
+                last = current
+                time.sleep(self.debounce)
+                last = self._signature()
+                self._notify()
@@ -0,0 +1,303 @@
+"""Filtre de abonament evaluate pe server, o singură dată per articol nou.
+
+Un filtru are un nume și reguli de includere/excludere:
+
+    {"include": {"keywords": ["inteligență artificială", "ai"],
+                 "patterns": ["\\bGPT-\\d+"], "sources": ["BBC News"]},
+     "exclude": {"keywords": ["sponsorizat"]}}
+
+Un articol se potrivește dacă sursa e printre `include.sources` (când
+există), textul conține cel puțin un termen din `include.keywords` sau
+`include.patterns` (când există) și nu conține niciun termen de excludere.
+Expresiile cu cuantificatori imbricați (ex: `(a+)+`), care pot rula un timp
+exponențial pe un text ales, sunt refuzate la validare.
+
+Toate filtrele sunt compilate împreună: cuvintele cheie într-un dicționar
+de fraze (căutare pe n-grame de cuvinte normalizate), expresiile regulate
+într-o singură alternanță, sursele într-un dicționar. Costul per articol
+depinde de lungimea textului și de numărul de potriviri, nu de numărul de
+filtre sau de clienți.
+"""
+import heapq
+import re
+import threading
+from collections import deque
+
+try:
+    import re._parser as sre_parse
+    from re._constants import ASSERT, ASSERT_NOT, BRANCH, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+except ImportError:  # Python < 3.11
+    import sre_parse
+    from sre_constants import ASSERT, ASSERT_NOT, BRANCH, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+
+from clustering import normalize
+
+RULE_KINDS = ('keywords', 'patterns', 'sources')
+MAX_TERMS = 100
+MAX_PATTERN_LENGTH = 200
+MAX_NAME_LENGTH = 64
+
+_WORD_RE = re.compile(r'\w+')
+_NAME_RE = re.compile(r'^[\w.-]+$')
+# Referințele înapoi și grupurile cu nume nu pot fi combinate într-o alternanță
+_UNSAFE_PATTERN_RE = re.compile(r'\\[1-9]|\(\?P[<=]')
+_BASE_FLAGS = re.compile('', re.IGNORECASE).flags
+
+
+def _phrase(keyword):
+    return tuple(_WORD_RE.findall(normalize(keyword)))
+
+
+def validate_rules(name, rules):
+    """Verifică și normalizează regulile unui filtru; ridică ValueError dacă nu sunt valide."""
+    if not isinstance(name, str) or not name or len(name) > MAX_NAME_LENGTH or not _NAME_RE.match(name):
+        raise ValueError("Numele filtrului trebuie să conțină doar litere, cifre, '.', '-' sau '_'")
+    if not isinstance(rules, dict):
+        raise ValueError("Regulile filtrului trebuie să fie un obiect JSON")
+
+    normalized = {}
+    for side in ('include', 'exclude'):
+        section = rules.get(side) or {}
+        if not isinstance(section, dict):
+            raise ValueError(f"'{side}' trebuie să fie un obiect JSON")
+        normalized[side] = {}
+        for kind in RULE_KINDS:
+            terms = section.get(kind) or []
+            if not isinstance(terms, list) or not all(isinstance(term, str) and term.strip() for term in terms):
+                raise ValueError(f"'{side}.{kind}' trebuie să fie o listă de texte nevide")
+            if len(terms) > MAX_TERMS:
+                raise ValueError(f"'{side}.{kind}' are mai mult de {MAX_TERMS} termeni")
+            if kind == 'keywords':
+                for term in terms:
+                    if not _phrase(term):
+                        raise ValueError(f"Cuvântul cheie '{term}' nu conține litere sau cifre")
+            if kind == 'patterns':
+                for term in terms:
+                    _compile_pattern(term)
+            normalized[side][kind] = list(dict.fromkeys(terms))
+
+    if not any(normalized['include'].values()) and not any(normalized['exclude'].values()):
+        raise ValueError("Filtrul nu are nicio regulă")
+    return normalized
+
+
+def _nested_repeat(parsed, in_repeat=False):
+    # O repetiție care conține altă repetiție sau o alternanță poate reveni
+    # (backtracking) de un număr exponențial de ori pe același text
+    for op, value in parsed:
+        if op in (MAX_REPEAT, MIN_REPEAT):
+            low, high, body = value
+            if in_repeat and high > 1:
+                return True
+            if _nested_repeat(body, in_repeat or high > 1):
+                return True
+        elif op == BRANCH:
+            if in_repeat:
+                return True
+            if any(_nested_repeat(branch, in_repeat) for branch in value[1]):
+                return True
+        elif op in (SUBPATTERN, ASSERT, ASSERT_NOT):
+            if _nested_repeat(value[-1], in_repeat):
+                return True
+    return False
+
+
+def _compile_pattern(pattern):
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise ValueError(f"Expresia '{pattern[:20]}...' depășește {MAX_PATTERN_LENGTH} caractere")
+    if _UNSAFE_PATTERN_RE.search(pattern):
+        raise ValueError(f"Expresia '{pattern}' folosește referințe înapoi sau grupuri cu nume")
+    try:
+        # Se compilează forma din alternanța comună, ca o expresie acceptată
+        # aici să nu poată strica filtrele celorlalți la recompilare
+        compiled = re.compile(f'(?:{pattern})', re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Expresie regulată invalidă '{pattern}': {e}") from e
+    if compiled.flags != _BASE_FLAGS:
+        raise ValueError(f"Expresia '{pattern}' folosește indicatori globali ca (?i); "
+                         f"folosiți forma locală (?i:...)")
+    if _nested_repeat(sre_parse.parse(pattern)):
+        raise ValueError(f"Expresia '{pattern}' repetă un grup care conține o repetiție sau o "
+                         f"alternanță; folosiți o clasă de caractere sau cuvinte cheie")
+    if compiled.match(''):
+        raise ValueError(f"Expresia '{pattern}' se potrivește cu textul gol")
+    return compiled
+
+
+class _Matcher:
+    """Toate filtrele compilate într-o singură structură de căutare."""
+
+    def __init__(self, filters):
+        self.phrases = {}     # tuplu de cuvinte -> [(filtru, parte)]
+        self.sources = {}     # sursă -> [(filtru, parte)]
+        self.patterns = []    # [(expresie compilată, [(filtru, parte)])]
+        self.needs_text = set()
+        self.needs_source = set()
+        self.always = []
+
+        pattern_refs = {}
+        for name, rules in filters.items():
+            for side in ('include', 'exclude'):
+                section = rules[side]
+                for keyword in section['keywords']:
+                    self.phrases.setdefault(_phrase(keyword), []).append((name, side))
+                for source in section['sources']:
+                    self.sources.setdefault(source, []).append((name, side))
+                for pattern in section['patterns']:
+                    pattern_refs.setdefault(pattern, []).append((name, side))
+            include = rules['include']
+            if include['keywords'] or include['patterns']:
+                self.needs_text.add(name)
+            if include['sources']:
+                self.needs_source.add(name)
+            if name not in self.needs_text and name not in self.needs_source:
+                self.always.append(name)
+
+        self.max_phrase = max((len(phrase) for phrase in self.phrases), default=0)
+        self.patterns = [(_compile_pattern(pattern), refs) for pattern, refs in pattern_refs.items()]
+        self.combined = None
+        if self.patterns:
+            try:
+                self.combined = re.compile('|'.join(f'(?:{pattern})' for pattern in pattern_refs),
+                                           re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Expresiile filtrelor nu pot fi combinate: {e}") from e
+
+    def _pattern_hits(self, text):
+        # Alternanța găsește pozițiile unde începe o potrivire; doar acolo se
+        # verifică expresiile individuale (mai multe pot începe în același loc)
+        remaining = list(range(len(self.patterns)))
+        pos = 0
+        while remaining:
+            match = self.combined.search(text, pos)
+            if match is None:
+                break
+            start = match.start()
+            for index in list(remaining):
+                compiled, refs = self.patterns[index]
+                if compiled.match(text, start):
+                    remaining.remove(index)
+                    yield from refs
+            pos = start + 1
+
+    def match(self, article):
+        """Numele filtrelor care acceptă articolul."""
+        text = f"{article.get('title') or ''} {article.get('summary') or article.get('description') or ''}"
+        refs = []
+        if self.phrases:
+            words = _WORD_RE.findall(normalize(text))
+            for word in set(words):
+                refs.extend(self.phrases.get((word,), ()))
+            for size in range(2, self.max_phrase + 1):
+                for start in range(len(words) - size + 1):
+                    refs.extend(self.phrases.get(tuple(words[start:start + size]), ()))
+        if self.combined is not None:
+            refs.extend(self._pattern_hits(text))
+
+        text_hits, excluded = set(), set()
+        for name, side in refs:
+            (text_hits if side == 'include' else excluded).add(name)
+
+        source_hits = set()
+        for name, side in self.sources.get(article.get('source'), ()):
+            (source_hits if side == 'include' else excluded).add(name)
+
+        candidates = text_hits | source_hits
+        candidates.update(self.always)
+        return [name for name in candidates
+                if name not in excluded
+                and (name not in self.needs_text or name in text_hits)
+                and (name not in self.needs_source or name in source_hits)]
+
+
+class FilterIndex:
+    """Filtrele definite pe server și ultimele `window` articole potrivite pentru fiecare."""
+
+    def __init__(self, window=500):
+        self.window = window
+        self.filters = {}
+        self.matches = {}
+        self._matcher = _Matcher({})
+        self._lock = threading.Lock()
+
+    def _record(self, matcher, articles):
+        for article in sorted(articles, key=lambda item: item['id']):
+            for name in matcher.match(article):
+                self.matches[name].append(article)
+
+    def load(self, filters, articles=()):
+        """Încarcă filtrele salvate și le aplică pe articolele recente (ex: la pornire).
+
+        Filtrele care nu mai trec validarea (ex: salvate de o versiune mai veche) sunt ignorate.
+        """
+        valid = {}
+        for name, rules in filters.items():
+            try:
+                valid[name] = validate_rules(name, rules)
+            except ValueError as e:
+                print(f"Filtrul {name} este ignorat: {e}")
+        with self._lock:
+            self.filters = valid
+            self.matches = {name: deque(maxlen=self.window) for name in self.filters}
+            self._matcher = _Matcher(self.filters)
+            self._record(self._matcher, articles)
+
+    def set(self, name, rules, articles=()):
+        """Adaugă sau înlocuiește un filtru; returnează regulile normalizate.
+
+        Lista de potriviri a filtrului este reconstruită din `articles`.
+        """
+        rules = validate_rules(name, rules)
+        backfill = _Matcher({name: rules})
+        with self._lock:
+            self.filters[name] = rules
+            self.matches[name] = deque(maxlen=self.window)
+            self._matcher = _Matcher(self.filters)
+            self._record(backfill, articles)
+        return rules
+
+    def remove(self, name):
+        with self._lock:
+            if self.filters.pop(name, None) is None:
+                return False
+            self.matches.pop(name, None)
+            self._matcher = _Matcher(self.filters)
+            return True
+
+    def add(self, articles):
+        """Evaluează articolele noi o singură dată; returnează numărul de potriviri."""
+        matcher = self._matcher
+        matched = [(article, matcher.match(article)) for article in articles]
+        count = 0
+        with self._lock:
+            for article, names in matched:
+                for name in names:
+                    # Filtrul poate fi șters între timp
+                    if name in self.matches:
+                        self.matches[name].append(article)
+                        count += 1
+        return count
+
+    def __contains__(self, name):
+        return name in self.filters
+
+    def latest(self, name, limit=50):
+        """Cele mai recente articole potrivite, după data publicării."""
+        with self._lock:
+            articles = list(self.matches.get(name, ()))
+        return heapq.nlargest(limit, articles,
+                              key=lambda article: (article.get('published_ts') or 0, article['id']))
+
+    def since(self, name, cursor, limit=500):
+        """Articolele potrivite cu id > cursor, în ordine crescătoare."""
+        with self._lock:
+            result = [article for article in self.matches.get(name, ()) if article['id'] > cursor]
+        # Loturile de la worker-i diferiți pot ajunge în altă ordine decât id-urile
+        result.sort(key=lambda article: article['id'])
+        return result[:limit]
+
+    def snapshot(self):
+        """{nume: {'rules': reguli, 'matches': număr de articole reținute}}."""
+        with self._lock:
+            return {name: {'rules': rules, 'matches': len(self.matches.get(name, ()))}
+                    for name, rules in self.filters.items()}
@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+
+# Stările circuit breaker-ului
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Câmpurile persistate pentru fiecare feed
+HEALTH_FIELDS = ('url', 'name', 'state', 'consecutive_failures', 'last_success', 'last_failure',
+                 'avg_latency', 'last_status', 'last_error', 'open_until')
+
+
+def _new_record(url, name=None):
+    return {
+        'url': url,
+        'name': name,
+        'state': CLOSED,
+        'consecutive_failures': 0,
+        'last_success': None,
+        'last_failure': None,
+        'avg_latency': None,
+        'last_status': None,
+        'last_error': None,
+        'open_until': None,
+    }
+
+
+class HealthTracker:
+    """Starea de sănătate a feed-urilor, cu circuit breaker și backoff exponențial.
+
+    După `failure_threshold` eșecuri consecutive circuitul se deschide și
+    feed-ul nu mai este descărcat până la `open_until`. Apoi o singură
+    încercare de probă (half-open) decide: succes -> închis, eșec -> deschis
+    din nou, cu o pauză de două ori mai lungă (până la `max_backoff`).
+    """
+
+    def __init__(self, store=None, failure_threshold=3, base_backoff=300, max_backoff=6 * 3600):
+        self.store = store
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.records = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Încarcă starea persistată (dacă există un backend de stocare)."""
+        if self.store is not None:
+            with self._lock:
+                self.records = self.store.load_health()
+
+    def _save(self, record):
+        if self.store is not None:
+            try:
+                self.store.save_health(record)
+            except Exception as e:
+                print(f"Eroare la salvarea stării feed-ului {record['url']}: {e}")
+
+    def allow(self, url):
+        """Verifică dacă feed-ul poate fi descărcat acum (trece circuitul în half-open la nevoie)."""
+        with self._lock:
+            record = self.records.get(url)
+            if record is None or record['state'] == CLOSED:
+                return True
+            if record['state'] == OPEN and time.time() >= (record['open_until'] or 0):
+                record['state'] = HALF_OPEN
+                return True
+            return record['state'] == HALF_OPEN
+
+    def retry_at(self, url):
+        """Momentul de la care feed-ul poate fi reîncercat (None dacă circuitul e închis)."""
+        with self._lock:
+            record = self.records.get(url)
+            if record is None or record['state'] != OPEN:
+                return None
+            return record['open_until']
+
+    def _record(self, url, name):
+        record = self.records.get(url)
+        if record is None:
+            record = self.records[url] = _new_record(url, name)
+        if name:
+            record['name'] = name
+        return record
+
+    def _update_latency(self, record, latency):
+        if latency is None:
+            return
+        if record['avg_latency'] is None:
+            record['avg_latency'] = latency
+        else:
+            # Medie mobilă exponențială
+            record['avg_latency'] = 0.8 * record['avg_latency'] + 0.2 * latency
+
+    def record_success(self, url, latency=None, status=None, name=None):
+        with self._lock:
+            record = self._record(url, name)
+            if record['state'] != CLOSED:
+                print(f"Feed-ul {record['name'] or url} funcționează din nou")
+            record.update(state=CLOSED, consecutive_failures=0, last_success=time.time(),
+                          last_status=status, last_error=None, open_until=None)
+            self._update_latency(record, latency)
+            snapshot = dict(record)
+        self._save(snapshot)
+
+    def record_failure(self, url, latency=None, status=None, error=None, name=None):
+        with self._lock:
+            record = self._record(url, name)
+            now = time.time()
+            record['consecutive_failures'] += 1
+            record.update(last_failure=now, last_status=status, last_error=error)
+            self._update_latency(record, latency)
+
+            failures = record['consecutive_failures']
+            if record['state'] == HALF_OPEN or failures >= self.failure_threshold:
+                exponent = max(0, failures - self.failure_threshold)
+                backoff = min(self.max_backoff, self.base_backoff * (2 ** exponent))
+                # Jitter ca feed-urile căzute simultan să nu fie reîncercate simultan
+                backoff *= random.uniform(0.9, 1.1)
+                record.update(state=OPEN, open_until=now + backoff)
+                print(f"Circuit deschis pentru {record['name'] or url}: "
+                      f"{failures} eșecuri, reîncercare în {backoff:.0f} secunde")
+            snapshot = dict(record)
+        self._save(snapshot)
+
+    def get(self, url):
+        """Starea curentă a unui feed (copie), sau None dacă nu este urmărit."""
+        with self._lock:
+            record = self.records.get(url)
+            return dict(record) if record is not None else None
+
+    def update(self, reported):
+        """Preia starea unui feed așa cum a raportat-o worker-ul care îl descarcă.
+
+        În modul coordonator circuit breaker-ul rulează în worker-i; coordonatorul
+        doar păstrează (și persistă) ultima stare primită, pentru GET_HEALTH.
+        """
+        if reported.get('state') not in (CLOSED, OPEN, HALF_OPEN):
+            raise ValueError(f"Stare necunoscută: {reported.get('state')}")
+        record = _new_record(reported['url'])
+        record.update((field, reported[field]) for field in HEALTH_FIELDS if field in reported)
+        with self._lock:
+            self.records[record['url']] = record
+            snapshot = dict(record)
+        self._save(snapshot)
+
+    def snapshot(self):
+        """Lista stărilor tuturor feed-urilor urmărite."""
+        with self._lock:
+            return [dict(record) for record in self.records.values()]
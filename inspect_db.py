@@ -1,19 +1,218 @@
-import sqlite3
+"""Inspectarea și exportul bazei de date cu articole.
 
-conn = sqlite3.connect("rss_data.db")
-cursor = conn.cursor()
+Exemple:
+    python inspect_db.py                      # primele rânduri din fiecare tabel
+    python inspect_db.py stats                # dimensiuni tabele/indexuri, articole per sursă
+    python inspect_db.py export -f ndjson -o articole.ndjson.gz --gzip
+    python inspect_db.py export -f csv --source "BBC News" --since 2024-01-01 --until 2024-02-01
+    python inspect_db.py export -f columnar -o articole.rsb.gz
+    python inspect_db.py read articole.rsb.gz  # fișier columnar -> NDJSON
+    python inspect_db.py migrate              # aduce o bază de date veche la schema curentă
 
-# Afișează toate tabelele din baza de date
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-tables = cursor.fetchall()
-print("Tabele găsite:", tables)
+Exportul citește rândurile în loturi (fetchmany), deci memoria folosită
+rămâne constantă indiferent de numărul de articole.
+"""
+import argparse
+import contextlib
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
 
-# Afișează primele 5 rânduri din fiecare tabel
-for table_name, in tables:
-    print(f"\nDate din tabelul: {table_name}")
-    cursor.execute(f"SELECT * FROM {table_name} LIMIT 5")
-    rows = cursor.fetchall()
-    for row in rows:
-        print(row)
+import codec
+from storage import ARTICLE_FIELDS, SQLiteStore, parse_published
 
-conn.close()
+DB_FILE = 'rss_data.db'
+FORMATS = ('ndjson', 'csv', 'columnar')
+
+
+def parse_time(text):
+    """Epoch sau dată ISO/RFC 822 -> epoch UTC."""
+    if text is None:
+        return None
+    if text.lstrip('-').isdigit():
+        return int(text)
+    value = parse_published(text)
+    if value is None:
+        raise argparse.ArgumentTypeError(f"Dată invalidă: {text}")
+    return value
+
+
+def format_size(size):
+    if size is None:
+        return '?'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_ts(value):
+    return time.strftime('%Y-%m-%d %H:%M', time.gmtime(value)) if value is not None else '-'
+
+
+@contextlib.contextmanager
+def open_output(path, binary, compress):
+    """Fișierul de ieșire ('-' = stdout), opțional comprimat gzip."""
+    if path == '-':
+        raw = sys.stdout.buffer
+        close = False
+    else:
+        raw = open(path, 'wb')
+        close = True
+    stream = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) if compress else raw
+    try:
+        if binary:
+            yield stream
+        else:
+            text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+            try:
+                yield text
+            finally:
+                text.detach()
+    finally:
+        if compress:
+            stream.close()
+        if close:
+            raw.close()
+        else:
+            raw.flush()
+
+
+def show(store, limit):
+    """Primele rânduri din fiecare tabel."""
+    tables = store.describe(limit=limit)
+    print("Tabele găsite:", [(name,) for name in tables])
+
+    for table_name, rows in tables.items():
+        print(f"\nDate din tabelul: {table_name}")
+        for row in rows:
+            print(row)
+
+
+def stats(store):
+    """Dimensiunea tabelelor/indexurilor și numărul de articole per sursă."""
+    print(f"Baza de date: {store.db_file} ({format_size(os.path.getsize(store.db_file))})\n")
+    print(f"{'Nume':<40} {'Tip':<6} {'Rânduri':>10} {'Dimensiune':>12}")
+    for name, kind, rows, size in store.table_stats():
+        rows = '' if rows is None else rows
+        print(f"{name:<40} {kind:<6} {rows:>10} {format_size(size):>12}")
+
+    print(f"\n{'Sursă':<40} {'Articole':>10}  {'Primul':<16}  {'Ultimul':<16}")
+    for source, count, first, last in store.count_by_source():
+        print(f"{str(source):<40} {count:>10}  {format_ts(first):<16}  {format_ts(last):<16}")
+
+
+def export(store, args):
+    """Scrie articolele filtrate în formatul ales; returnează numărul de articole."""
+    chunks = store.iter_articles(sources=args.source, since=args.since, until=args.until,
+                                 chunk_size=args.chunk_size)
+    fields = list(ARTICLE_FIELDS)
+    # Formatul columnar este întotdeauna comprimat
+    compress = args.gzip or args.format == 'columnar'
+    total = 0
+
+    try:
+        with open_output(args.output, args.format == 'columnar', compress) as out:
+            if args.format == 'ndjson':
+                for chunk in chunks:
+                    out.write(''.join(json.dumps(article, ensure_ascii=False) + '\n' for article in chunk))
+                    total += len(chunk)
+            elif args.format == 'csv':
+                writer = csv.writer(out)
+                writer.writerow(fields)
+                for chunk in chunks:
+                    writer.writerows([[article[field] for field in fields] for article in chunk])
+                    total += len(chunk)
+            else:
+                # Câte un răspuns binar (codec.py) per lot, concatenate
+                for chunk in chunks:
+                    out.write(codec.encode_feed(chunk, fields))
+                    total += len(chunk)
+    except BaseException:
+        # Un export incomplet nu trebuie confundat cu unul valid
+        if args.output != '-':
+            with contextlib.suppress(OSError):
+                os.remove(args.output)
+        raise
+    return total
+
+
+def read_columnar(path, output):
+    """Convertește un export columnar înapoi în NDJSON."""
+    total = 0
+    with gzip.open(path, 'rb') as stream, open_output(output, False, False) as out:
+        for article in codec.iter_articles(stream):
+            out.write(json.dumps(article, ensure_ascii=False) + '\n')
+            total += 1
+    return total
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Inspectarea și exportul bazei de date RSS")
+    parser.add_argument('--db', default=DB_FILE, help="fișierul SQLite")
+    subparsers = parser.add_subparsers(dest='command')
+
+    show_parser = subparsers.add_parser('show', help="primele rânduri din fiecare tabel (implicit)")
+    show_parser.add_argument('--limit', type=int, default=5)
+
+    subparsers.add_parser('stats', help="dimensiuni tabele/indexuri și articole per sursă")
+
+    export_parser = subparsers.add_parser('export', help="exportă articolele în flux")
+    export_parser.add_argument('-f', '--format', choices=FORMATS, default='ndjson')
+    export_parser.add_argument('-o', '--output', default='-', help="fișierul de ieșire ('-' = stdout)")
+    export_parser.add_argument('--gzip', action='store_true', help="comprimă ieșirea NDJSON/CSV")
+    export_parser.add_argument('--source', action='append', help="doar sursa dată (se poate repeta)")
+    export_parser.add_argument('--since', type=parse_time, help="publicate de la (epoch sau dată)")
+    export_parser.add_argument('--until', type=parse_time, help="publicate înainte de (epoch sau dată)")
+    export_parser.add_argument('--chunk-size', type=int, default=5000, help="rânduri citite per lot")
+
+    read_parser = subparsers.add_parser('read', help="convertește un export columnar în NDJSON")
+    read_parser.add_argument('path')
+    read_parser.add_argument('-o', '--output', default='-')
+
+    subparsers.add_parser('migrate', help="aduce baza de date la schema curentă (ca la pornirea serverului)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == 'read':
+        total = read_columnar(args.path, args.output)
+        print(f"Citite {total} articole din {args.path}", file=sys.stderr)
+        return
+
+    if not os.path.exists(args.db):
+        print(f"Baza de date {args.db} nu există", file=sys.stderr)
+        sys.exit(1)
+    store = SQLiteStore(args.db)
+
+    if args.command == 'migrate':
+        store.init()
+        print(f"Baza de date {args.db} folosește schema curentă", file=sys.stderr)
+        return
+    if args.command in ('stats', 'export'):
+        missing = store.missing_columns()
+        if missing:
+            print(f"Baza de date {args.db} folosește o schemă veche (lipsesc coloanele: "
+                  f"{', '.join(missing)}).\nRulați 'python inspect_db.py migrate' sau porniți "
+                  f"serverul o dată, apoi reîncercați.", file=sys.stderr)
+            sys.exit(1)
+
+    if args.command == 'stats':
+        stats(store)
+    elif args.command == 'export':
+        start = time.perf_counter()
+        total = export(store, args)
+        print(f"Exportate {total} articole în {time.perf_counter() - start:.1f} secunde",
+              file=sys.stderr)
+    else:
+        show(store, getattr(args, 'limit', 5))
+
+
+if __name__ == '__main__':
+    main()
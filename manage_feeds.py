@@ -1,11 +1,19 @@
-import json
+import argparse
+import csv
 import os
 import sys
+import time
 import requests
 import feedparser
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
+import config_store
+from storage import SQLiteStore
+
 CONFIG_FILE = 'feeds_config.json'
+DB_FILE = 'rss_data.db'
 
 def load_config():
     """Încarcă configurația din fișier."""
@@ -14,14 +22,29 @@ def load_config():
         print(" Pornește mai întâi serverul pentru a crea configurația implicită.")
         sys.exit(1)
     
-    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    try:
+        return config_store.load_config(CONFIG_FILE)
+    except config_store.ConfigError as e:
+        print(f" {e}")
+        sys.exit(1)
+
+def update_config(change):
+    """Aplică `change(config)` pe configurația curentă, sub lock; salvează dacă returnează True."""
+    try:
+        changed = config_store.update(CONFIG_FILE, change)
+    except config_store.ConfigError as e:
+        print(f" {e}")
+        sys.exit(1)
+    if changed:
+        print(f" Configurația a fost salvată în {CONFIG_FILE}")
+    return changed
 
-def save_config(config):
-    """Salvează configurația în fișier."""
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
-    print(f" Configurația a fost salvată în {CONFIG_FILE}")
+def set_setting(key, value):
+    """Modifică o singură setare, fără a atinge restul configurației."""
+    def change(config):
+        config['settings'][key] = value
+        return True
+    return update_config(change)
 
 def validate_url(url):
     """Validează dacă URL-ul este valid."""
@@ -31,42 +54,90 @@ def validate_url(url):
     except:
         return False
 
-def test_feed(url):
-    """Testează dacă feed-ul funcționează."""
-    print(f"Testez feed-ul: {url}")
-    
+def check_feed(url, timeout=10):
+    """Descarcă și parsează feed-ul fără să afișeze nimic.
+
+    Returnează un dicționar cu: ok, title, entries, first_title, latency, error.
+    """
+    result = {'ok': False, 'title': None, 'entries': 0, 'first_title': None,
+              'latency': None, 'error': None}
+    start = time.perf_counter()
     try:
         # Testează descărcarea
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10, verify=False)
+        response = requests.get(url, headers=headers, timeout=timeout, verify=False)
         response.raise_for_status()
         
         # Testează parsarea
         feed = feedparser.parse(response.text)
+        result['latency'] = time.perf_counter() - start
+        result['entries'] = len(feed.entries)
+        result['title'] = getattr(feed.feed, 'title', 'Titlu necunoscut')
         
         if not feed.entries:
-            print("Feed-ul nu contine articole")
-            return False
-        
-        feed_title = getattr(feed.feed, 'title', 'Titlu necunoscut')
-        articles_count = len(feed.entries)
-        
-        print(f"Feed functioneaza!")
-        print(f"   Titlu: {feed_title}")
-        print(f"   Articole: {articles_count}")
+            result['error'] = "Feed-ul nu contine articole"
+            return result
         
-        if articles_count > 0:
-            first_article = feed.entries[0]
-            article_title = getattr(first_article, 'title', 'Fara titlu')
-            print(f"   Primul articol: {article_title}")
-        
-        return True
+        result['first_title'] = getattr(feed.entries[0], 'title', 'Fara titlu')
+        result['ok'] = True
         
     except Exception as e:
-        print(f"Eroare la testarea feed-ului: {e}")
+        result['latency'] = time.perf_counter() - start
+        result['error'] = str(e)
+    return result
+
+def test_feed(url):
+    """Testează dacă feed-ul funcționează."""
+    print(f"Testez feed-ul: {url}")
+    
+    result = check_feed(url)
+    if not result['ok']:
+        if result['entries'] == 0 and result['title'] is not None:
+            print(result['error'])
+        else:
+            print(f"Eroare la testarea feed-ului: {result['error']}")
         return False
+    
+    print(f"Feed functioneaza!")
+    print(f"   Titlu: {result['title']}")
+    print(f"   Articole: {result['entries']}")
+    print(f"   Primul articol: {result['first_title']}")
+    return True
+
+def load_health():
+    """Starea de sănătate a feed-urilor salvată de server ({} dacă nu există)."""
+    if not os.path.exists(DB_FILE):
+        return {}
+    try:
+        return SQLiteStore(DB_FILE).load_health()
+    except Exception:
+        return {}
+
+def format_health(record):
+    """Descrierea pe un rând a stării unui feed."""
+    if record is None:
+        return "Stare: necunoscută (nu a fost încă descărcat)"
+    
+    if record['state'] == 'open':
+        until = time.strftime('%d.%m %H:%M', time.localtime(record['open_until'] or 0))
+        state = f"CIRCUIT DESCHIS până la {until}"
+    elif record['state'] == 'half_open':
+        state = "PROBĂ (half-open)"
+    else:
+        state = "OK"
+    
+    parts = [f"Stare: {state}"]
+    if record['consecutive_failures']:
+        parts.append(f"eșecuri consecutive: {record['consecutive_failures']}")
+    if record['avg_latency'] is not None:
+        parts.append(f"latență medie: {record['avg_latency'] * 1000:.0f} ms")
+    if record['last_status'] is not None:
+        parts.append(f"ultimul status: {record['last_status']}")
+    if record['last_success']:
+        parts.append(f"ultimul succes: {time.strftime('%d.%m %H:%M', time.localtime(record['last_success']))}")
+    return " | ".join(parts)
 
 def list_feeds():
     """Afișează lista feed-urilor."""
@@ -78,6 +149,8 @@ def list_feeds():
             print("Nu sunt feed-uri configurate.")
             return
         
+        health = load_health()
+        
         print(f"\nLista feed-urilor ({len(feeds)} total):")
         print("=" * 80)
         
@@ -85,6 +158,11 @@ def list_feeds():
             status = "ACTIV" if feed['active'] else "INACTIV"
             print(f"{i:2d}. [{status}] {feed['name']}")
             print(f"    URL: {feed['url']}")
+            if feed['active'] or feed['url'] in health:
+                print(f"    {format_health(health.get(feed['url']))}")
+                error = (health.get(feed['url']) or {}).get('last_error')
+                if error:
+                    print(f"    Ultima eroare: {error[:100]}")
             print()
             
         # Forțează afișarea pe Windows
@@ -143,8 +221,17 @@ def add_feed():
         "active": active
     }
     
-    config['feeds'].append(new_feed)
-    save_config(config)
+    # Configurația poate fi modificată între timp: verificarea se repetă sub lock
+    def change(config):
+        for feed in config['feeds']:
+            if feed['url'] == url or feed['name'] == name:
+                print(f" Feed-ul a fost adăugat între timp: {feed['name']}")
+                return False
+        config['feeds'].append(new_feed)
+        return True
+    
+    if not update_config(change):
+        return
     
     status = " ACTIV" if active else " INACTIV"
     print(f" Feed adăugat cu succes: {name} ({status})")
@@ -182,9 +269,18 @@ def remove_feed():
             print(" Operație anulată.")
             return
         
-        # Șterge feed-ul
-        config['feeds'].pop(index)
-        save_config(config)
+        # Șterge feed-ul după URL (indexul se poate schimba între timp)
+        url = feed_to_remove['url']
+        
+        def change(config):
+            remaining = [feed for feed in config['feeds'] if feed['url'] != url]
+            changed = len(remaining) != len(config['feeds'])
+            config['feeds'] = remaining
+            return changed
+        
+        if not update_config(change):
+            print(" Feed-ul nu mai există în configurație.")
+            return
         
         print(f" Feed șters cu succes: {feed_to_remove['name']}")
         
@@ -219,8 +315,16 @@ def toggle_feed():
         feed = feeds[index]
         new_status = not feed['active']
         
-        config['feeds'][index]['active'] = new_status
-        save_config(config)
+        def change(config):
+            for current in config['feeds']:
+                if current['url'] == feed['url']:
+                    current['active'] = new_status
+                    return True
+            return False
+        
+        if not update_config(change):
+            print(" Feed-ul nu mai există în configurație.")
+            return
         
         status = " ACTIVAT" if new_status else " DEZACTIVAT"
         print(f" Feed {status}: {feed['name']}")
@@ -250,8 +354,7 @@ def edit_settings():
         try:
             new_interval = int(input(f"Interval nou (actual: {settings['update_interval']}): "))
             if new_interval > 0:
-                settings['update_interval'] = new_interval
-                save_config(config)
+                set_setting('update_interval', new_interval)
                 print(f" Interval actualizat la {new_interval} secunde")
             else:
                 print(" Intervalul trebuie să fie > 0")
@@ -262,8 +365,7 @@ def edit_settings():
         try:
             new_max = int(input(f"Număr maxim nou (actual: {settings['max_articles_per_feed']}): "))
             if new_max > 0:
-                settings['max_articles_per_feed'] = new_max
-                save_config(config)
+                set_setting('max_articles_per_feed', new_max)
                 print(f" Maxim actualizat la {new_max} articole")
             else:
                 print(" Numărul trebuie să fie > 0")
@@ -274,14 +376,134 @@ def edit_settings():
         try:
             new_timeout = int(input(f"Timeout nou (actual: {settings['request_timeout']}): "))
             if new_timeout > 0:
-                settings['request_timeout'] = new_timeout
-                save_config(config)
+                set_setting('request_timeout', new_timeout)
                 print(f" Timeout actualizat la {new_timeout} secunde")
             else:
                 print(" Timeout-ul trebuie să fie > 0")
         except ValueError:
             print(" Te rog să introduci un număr valid!")
 
+def read_opml(path):
+    """Citește feed-urile dintr-un fișier OPML: lista de (nume, url)."""
+    tree = ET.parse(path)
+    feeds = []
+    for outline in tree.iter('outline'):
+        url = outline.get('xmlUrl')
+        if url:
+            name = outline.get('title') or outline.get('text') or url
+            feeds.append((name.strip(), url.strip()))
+    return feeds
+
+def read_csv(path):
+    """Citește feed-urile dintr-un CSV cu coloanele nume,url (antetul este opțional)."""
+    feeds = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or not row[1].strip():
+                continue
+            name, url = row[0].strip(), row[1].strip()
+            if name.lower() == 'name' and url.lower() == 'url':
+                continue  # Antet
+            feeds.append((name or url, url))
+    return feeds
+
+def bulk_import(path, workers=16, timeout=10, active=True, keep_invalid=False, dry_run=False):
+    """Importă feed-uri dintr-un fișier OPML/CSV, validându-le în paralel.
+
+    Configurația este scrisă o singură dată, la final, sub lock: feed-urile
+    adăugate între timp (din meniu sau alt import) sunt păstrate, iar
+    duplicatele lor sunt ignorate. Returnează numărul de feed-uri adăugate (0 cu `dry_run`).
+    """
+    config = load_config()
+    
+    if path.lower().endswith('.csv'):
+        candidates = read_csv(path)
+    else:
+        candidates = read_opml(path)
+    
+    # Index pentru deduplicare (în loc de căutare liniară pentru fiecare feed)
+    known_urls = {feed['url']: feed['name'] for feed in config['feeds']}
+    known_names = {feed['name'] for feed in config['feeds']}
+    
+    to_check = []
+    skipped = []
+    for name, url in candidates:
+        if not validate_url(url):
+            skipped.append((name, url, "URL invalid"))
+        elif url in known_urls:
+            skipped.append((name, url, f"există deja ({known_urls[url]})"))
+        elif name in known_names:
+            skipped.append((name, url, "nume duplicat"))
+        else:
+            known_urls[url] = name
+            known_names.add(name)
+            to_check.append((name, url))
+    
+    print(f"Feed-uri în fișier: {len(candidates)}, de validat: {len(to_check)}, ignorate: {len(skipped)}")
+    
+    # Validare paralelă cu un număr limitat de conexiuni simultane
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda item: check_feed(item[1], timeout), to_check))
+    elapsed = time.perf_counter() - start
+    
+    print(f"\nRaport validare ({elapsed:.1f}s):")
+    print("=" * 80)
+    new_feeds = []
+    for (name, url), result in zip(to_check, results):
+        latency = f"{result['latency'] * 1000:7.0f} ms" if result['latency'] is not None else "      - ms"
+        status = "OK    " if result['ok'] else "EROARE"
+        print(f"[{status}] {latency} {result['entries']:4d} art.  {name}")
+        if not result['ok']:
+            print(f"         {url}: {result['error']}")
+        
+        if result['ok'] or keep_invalid:
+            new_feeds.append({
+                "name": name,
+                "url": url,
+                "active": active and result['ok']
+            })
+    
+    for name, url, reason in skipped:
+        print(f"[IGNORAT]  {name}: {reason}")
+    
+    if dry_run:
+        print("=" * 80)
+        print(f"Mod --dry-run: {len(new_feeds)} din {len(to_check)} feed-uri validate ar fi adăugate; "
+              f"configurația NU a fost modificată")
+        return 0
+    
+    added = []
+    if new_feeds:
+        def change(config):
+            urls = {feed['url'] for feed in config['feeds']}
+            names = {feed['name'] for feed in config['feeds']}
+            added.extend(feed for feed in new_feeds if feed['url'] not in urls and feed['name'] not in names)
+            config['feeds'].extend(added)
+            return bool(added)
+        
+        update_config(change)
+        if len(added) < len(new_feeds):
+            print(f"Ignorate {len(new_feeds) - len(added)} feed-uri adăugate între timp de altcineva")
+    
+    print("=" * 80)
+    print(f"Feed-uri adăugate: {len(added)} din {len(to_check)} validate")
+    return len(added)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Gestionare feed-uri RSS")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    import_parser = subparsers.add_parser('import', help="import în masă din OPML sau CSV")
+    import_parser.add_argument('path', help="fișierul .opml/.xml sau .csv")
+    import_parser.add_argument('--workers', type=int, default=16, help="validări simultane")
+    import_parser.add_argument('--timeout', type=float, default=10, help="timeout per feed (s)")
+    import_parser.add_argument('--inactive', action='store_true', help="adaugă feed-urile ca inactive")
+    import_parser.add_argument('--keep-invalid', action='store_true',
+                               help="adaugă și feed-urile care nu funcționează (inactive)")
+    import_parser.add_argument('--dry-run', action='store_true', help="doar validează, nu salvează")
+    return parser.parse_args(argv)
+
 def main():
     """Meniul principal."""
     while True:
@@ -322,7 +544,16 @@ def main():
 
 if __name__ == '__main__':
     try:
-        main()
+        args = parse_args(sys.argv[1:])
+        if args.command == 'import':
+            # Dezactivează warnings pentru SSL (altfel apare unul per feed validat)
+            import urllib3
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            bulk_import(args.path, workers=args.workers, timeout=args.timeout,
+                        active=not args.inactive, keep_invalid=args.keep_invalid,
+                        dry_run=args.dry_run)
+        else:
+            main()
     except KeyboardInterrupt:
         print("\n\n Programul a fost întrerupt. La revedere!")
     except Exception as e:
@@ -0,0 +1,89 @@
+"""Funcții comune pentru protocolul text dintre server, clienți, worker-i și relay-uri.
+
+O cerere este o linie 'COMANDA [argumente]'. Comenzile din BODY_COMMANDS
+au ca ultim argument lungimea unui corp JSON trimis după prima linie nouă.
+Răspunsul este trimis integral, apoi serverul închide conexiunea.
+"""
+import json
+import socket
+import time
+
+import codec
+
+# Comenzile care sunt urmate de un corp: 'COMANDA <lungime>\n<corp>'
+BODY_COMMANDS = ('INGEST', 'REPORT_HEALTH', 'SET_FILTER')
+MAX_REQUEST_BODY = 16 * 1024 * 1024
+
+# Ultimul argument al comenzilor care întorc articole: cere răspunsul în formatul binar
+BINARY_FLAG = 'BIN'
+
+# Câmpurile unui articol trimise clienților în răspunsul GET_FEED
+FEED_FIELDS = ('id', 'title', 'link', 'published', 'source', 'summary', 'published_ts', 'cluster_id')
+
+
+def _recv(conn, size, deadline):
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout("Termenul pentru citirea cererii a expirat")
+        conn.settimeout(remaining)
+    return conn.recv(size)
+
+
+def read_request(conn, deadline=None):
+    """Citește o cerere: returnează (comanda, argumente, corp).
+
+    `deadline` (time.monotonic()) limitează durata totală a citirii, inclusiv
+    a corpului, ca un client lent să nu țină conexiunea ocupată la nesfârșit.
+    """
+    data = _recv(conn, 1024, deadline)
+    header, _, body = data.partition(b'\n')
+    parts = header.decode().strip().split()
+    if not parts:
+        return '', [], b''
+
+    command, args = parts[0], parts[1:]
+    if command in BODY_COMMANDS and args:
+        length = int(args.pop())
+        if length > MAX_REQUEST_BODY:
+            raise ValueError(f"Corp prea mare: {length} octeți")
+        while len(body) < length:
+            chunk = _recv(conn, min(65536, length - len(body)), deadline)
+            if not chunk:
+                break
+            body += chunk
+    return command, args, body
+
+
+def wants_binary(args):
+    """Scoate argumentul 'BIN' din cerere; returnează True dacă clientul a cerut formatul binar."""
+    if args and args[-1] == BINARY_FLAG:
+        args.pop()
+        return True
+    return False
+
+
+def encode_feed(articles, extra_fields=(), binary=False):
+    """Serializează lista de articole în răspunsul GET_FEED (JSON sau binar, vezi codec.py)."""
+    fields = FEED_FIELDS + tuple(extra_fields)
+    if binary:
+        return codec.encode_feed(articles, fields)
+    return json.dumps({'articles': [{field: article.get(field) for field in fields}
+                                    for article in articles]}).encode()
+
+
+def send_request(host, port, header, body=None, timeout=30):
+    """Trimite o comandă (opțional cu corp JSON) și returnează răspunsul decodat."""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        if body is None:
+            sock.sendall(header.encode())
+        else:
+            payload = json.dumps(body).encode()
+            sock.sendall(f"{header} {len(payload)}\n".encode() + payload)
+        data = b''
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data.decode())
@@ -0,0 +1,157 @@
+"""Relay de citire: servește GET_FEED din memorie, fără să descarce feed-uri.
+
+Relay-ul se abonează la fluxul de articole al serverului principal
+(comanda SUBSCRIBE), păstrează ultimele `--window` articole în memorie
+și răspunde clienților proprii. Astfel capacitatea pentru clienți poate
+crește independent de procesul care descarcă și scrie articolele.
+
+Exemplu:
+    python server.py
+    python relay.py --primary 127.0.0.1:5000 --port 5001
+"""
+import argparse
+import heapq
+import json
+import socket
+import threading
+import time
+from collections import deque
+
+from admission import AdmissionControl, WorkerPool, QUEUE_FULL, reject
+from protocol import encode_feed, read_request, wants_binary
+
+# Câte secunde fără date (nici heartbeat) înseamnă conexiune moartă
+PRIMARY_TIMEOUT = 45
+RECONNECT_DELAY = 5
+
+
+class Relay:
+    """Fereastra de articole recente primită de la serverul principal."""
+
+    def __init__(self, primary_host, primary_port, window=500, feed_size=50,
+                 read_timeout=10, write_timeout=30):
+        self.primary_host = primary_host
+        self.primary_port = primary_port
+        self.feed_size = feed_size
+        self.read_timeout = read_timeout
+        self.write_timeout = write_timeout
+        self.admission = None
+        self.articles = deque(maxlen=window)
+        self.cursor = None
+        self.lock = threading.Lock()
+        # Răspunsul GET_FEED în ambele formate: JSON și binar ('GET_FEED BIN', vezi codec.py)
+        self.payloads = {False: encode_feed([]), True: encode_feed([], binary=True)}
+        self.payload_count = 0
+
+    def _apply(self, batch):
+        with self.lock:
+            for article in batch:
+                self.articles.append(article)
+                self.cursor = article['id']
+            # Reconstruiește răspunsul GET_FEED (ordonat după data publicării) o singură dată per lot
+            latest = heapq.nlargest(self.feed_size, self.articles,
+                                    key=lambda article: (article.get('published_ts') or 0, article['id']))
+            self.payloads = {False: encode_feed(latest), True: encode_feed(latest, binary=True)}
+            self.payload_count = len(latest)
+
+    def subscribe_once(self):
+        """O sesiune de abonare; se termină la eroare sau la închiderea conexiunii."""
+        start = f"-{self.articles.maxlen}" if self.cursor is None else str(self.cursor)
+        with socket.create_connection((self.primary_host, self.primary_port),
+                                      timeout=PRIMARY_TIMEOUT) as sock:
+            sock.sendall(f"SUBSCRIBE {start}".encode())
+            print(f"Abonat la {self.primary_host}:{self.primary_port} (cursor {start})")
+            pending = b''
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                # Aplică toate articolele primite în acest fragment ca un singur lot
+                batch = [message for message in map(json.loads, filter(None, lines)) if 'id' in message]
+                if batch:
+                    self._apply(batch)
+
+    def follow(self):
+        """Menține abonarea, cu reconectare de la ultimul cursor."""
+        while True:
+            try:
+                self.subscribe_once()
+                print("Serverul principal a închis fluxul")
+            except (OSError, ValueError) as e:
+                print(f"Eroare la fluxul de articole: {e}")
+            time.sleep(RECONNECT_DELAY)
+
+    def handle_client(self, conn, addr, counted=False):
+        try:
+            # Un client tăcut sau lent nu ține ocupat un thread din pool
+            command, args, body = read_request(conn, time.monotonic() + self.read_timeout)
+            conn.settimeout(self.write_timeout)
+            binary = wants_binary(args)
+            if command == 'GET_FEED':
+                with self.lock:
+                    payload, count = self.payloads[binary], self.payload_count
+                conn.sendall(payload)
+                print(f"Trimise {count} articole către client {addr}")
+            else:
+                conn.sendall(json.dumps({'error': 'Comanda necunoscută'}).encode())
+        except Exception as e:
+            print(f"Eroare la client {addr}: {e}")
+        finally:
+            conn.close()
+            if counted:
+                self.admission.release(addr[0])
+
+    def serve(self, s, admission=None, workers=32, queue_size=256):
+        """Acceptă clienți pe socket-ul dat, cu același control al admiterii ca serverul."""
+        self.admission = admission
+        pool = WorkerPool(self.handle_client, workers=workers, queue_size=queue_size,
+                          name='relay-client').start()
+        while True:
+            try:
+                conn, addr = s.accept()
+            except OSError:
+                break
+            reason, counted = admission.admit(addr[0]) if admission is not None else (None, False)
+            if reason is None and not pool.submit(conn, addr, counted):
+                if counted:
+                    admission.release(addr[0])
+                reason = QUEUE_FULL
+            if reason is not None:
+                reject(conn, reason)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relay de citire pentru serverul RSS")
+    parser.add_argument('--primary', default="127.0.0.1:5000", help="serverul principal (host:port)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--window', type=int, default=500, help="articole păstrate în memorie")
+    parser.add_argument('--threads', type=int, default=32, help="thread-uri pentru clienți")
+    parser.add_argument('--queue', type=int, default=256, help="conexiuni în așteptare înainte de refuz")
+    parser.add_argument('--max-connections-per-ip', type=int, default=16)
+    parser.add_argument('--rate-limit', type=float, default=20, help="cereri pe secundă per IP (0 = fără limită)")
+    parser.add_argument('--burst', type=int, default=40)
+    parser.add_argument('--read-timeout', type=float, default=10, help="secunde pentru citirea cererii")
+    args = parser.parse_args()
+
+    primary_host, _, primary_port = args.primary.rpartition(':')
+    relay = Relay(primary_host, int(primary_port), window=args.window, read_timeout=args.read_timeout)
+    admission = AdmissionControl(max_connections_per_ip=args.max_connections_per_ip,
+                                 rate=args.rate_limit, burst=args.burst)
+    threading.Thread(target=relay.follow, daemon=True).start()
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind((args.host, args.port))
+        s.listen()
+        print(f"Relay pornit pe {args.host}:{args.port}, sursa {args.primary}")
+        relay.serve(s, admission, workers=args.threads, queue_size=args.queue)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nRelay oprit.")
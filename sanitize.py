@@ -0,0 +1,81 @@
+"""Transformarea descrierilor HTML din feed-uri în rezumate text simplu.
+
+Rulează o singură dată, la ingestie, pe tot lotul unui feed: elimină
+tag-urile (și conținutul <script>/<style>), decodează entitățile HTML,
+comprimă spațiile și taie textul la `max_length` caractere, la o limită de
+cuvânt. Pentru descrieri mari se procesează doar un prefix suficient
+pentru rezumat, nu tot documentul.
+"""
+import html
+import re
+
+# Lungimea implicită a rezumatului (caractere)
+SUMMARY_LENGTH = 400
+
+_HIDDEN_RE = re.compile(r'<(script|style)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+# Un bloc ascuns neînchis (tăiat la capătul prefixului): tot ce urmează e cod, nu text
+_UNCLOSED_HIDDEN_RE = re.compile(r'<(?:script|style)\b|<!--', re.IGNORECASE)
+_BLOCK_RE = re.compile(r'<(?:br|/?p|/?div|/?li|/?h[1-6]|/?tr|/?blockquote)\b[^>]*>', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]*>')
+# Un tag sau o entitate tăiate la capătul unui prefix
+_PARTIAL_RE = re.compile(r'<[^>]*$|&#?\w*$')
+
+
+def _html_to_text(fragment):
+    fragment = _HIDDEN_RE.sub(' ', fragment)
+    unclosed = _UNCLOSED_HIDDEN_RE.search(fragment)
+    if unclosed:
+        fragment = fragment[:unclosed.start()]
+    fragment = _BLOCK_RE.sub(' ', fragment)
+    fragment = _TAG_RE.sub('', fragment)
+    return ' '.join(html.unescape(fragment).split())
+
+
+def html_to_text(fragment):
+    """Textul simplu dintr-un fragment HTML, cu spațiile comprimate."""
+    if not fragment:
+        return ''
+    if '<' not in fragment and '&' not in fragment:
+        return ' '.join(fragment.split())
+    return _html_to_text(fragment)
+
+
+def truncate(text, max_length):
+    """Taie textul la `max_length` caractere, la ultima limită de cuvânt."""
+    if len(text) <= max_length:
+        return text
+    cut = text[:max_length - 1]
+    space = cut.rfind(' ')
+    if space > max_length // 2:
+        cut = cut[:space]
+    return cut.rstrip(' .,;:') + '…'
+
+
+def summarize(fragment, max_length=SUMMARY_LENGTH):
+    """Rezumatul text simplu al unei descrieri HTML."""
+    if not fragment:
+        return ''
+    if max_length <= 0:
+        return html_to_text(fragment)
+
+    # Markup-ul e de obicei de câteva ori mai lung decât textul: încearcă
+    # un prefix și îl dublează doar dacă nu a ajuns pentru rezumat
+    window = max_length * 4
+    while window < len(fragment):
+        text = html_to_text(_PARTIAL_RE.sub('', fragment[:window]))
+        if len(text) > max_length:
+            return truncate(text, max_length)
+        window *= 2
+    return truncate(html_to_text(fragment), max_length)
+
+
+def summarize_batch(articles, max_length=SUMMARY_LENGTH, keep_html=True):
+    """Completează 'summary' pentru toate articolele unui lot (modificate pe loc).
+
+    Cu `keep_html=False`, HTML-ul original din 'description' nu mai este păstrat.
+    """
+    for article in articles:
+        article['summary'] = summarize(article.get('description'), max_length)
+        if not keep_html:
+            article['description'] = ''
+    return articles
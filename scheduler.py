@@ -0,0 +1,114 @@
+import random
+import threading
+import time
+
+# Marcaj pentru feed-urile aflate în curs de descărcare
+IN_FLIGHT = float('inf')
+
+# Starea persistată per feed: ultima descărcare și validatorii HTTP
+FEED_STATE_FIELDS = ('url', 'last_fetch', 'etag', 'last_modified')
+
+
+class FeedScheduler:
+    """Planifică descărcarea fiecărui feed activ independent.
+
+    Fiecare feed are propriul moment de scadență. La reîncărcarea
+    configurației se aplică doar diferențele: feed-urile noi devin scadente
+    imediat, cele eliminate sunt anulate, iar descărcările în curs continuă.
+
+    După o repornire, `restore()` reia programul din momentele ultimelor
+    descărcări: feed-urile descărcate recent așteaptă restul intervalului,
+    iar cele întârziate sunt împrăștiate aleator în următoarele `spread`
+    secunde, nu descărcate toate deodată.
+    """
+
+    def __init__(self):
+        self.feeds = {}
+        self.next_due = {}
+        self.last_fetch = {}
+        self.interval = None
+        self.spread = 0
+        self._cond = threading.Condition()
+
+    def restore(self, last_fetch, interval, spread=60):
+        """Preia momentele ultimelor descărcări ({url: epoch}), înainte de primul `sync`."""
+        with self._cond:
+            self.last_fetch.update(last_fetch)
+            self.interval = interval
+            self.spread = spread
+
+    def _first_due(self, url, now):
+        last = self.last_fetch.get(url)
+        if last is None or self.interval is None:
+            return now
+        due = last + self.interval
+        if due <= now:
+            due = now + random.uniform(0, self.spread)
+        return due
+
+    def sync(self, active_feeds):
+        """Aplică lista nouă de feed-uri active; returnează numele celor adăugate/eliminate/modificate."""
+        new_feeds = {feed['url']: feed for feed in active_feeds}
+        with self._cond:
+            added = [url for url in new_feeds if url not in self.feeds]
+            removed = [url for url in self.feeds if url not in new_feeds]
+            changed = [url for url in new_feeds
+                       if url in self.feeds and new_feeds[url] != self.feeds[url]]
+            result = {
+                'added': [new_feeds[url]['name'] for url in added],
+                'removed': [self.feeds[url]['name'] for url in removed],
+                'changed': [new_feeds[url]['name'] for url in changed],
+            }
+
+            now = time.time()
+            for url in removed:
+                self.next_due.pop(url, None)
+            for url in added:
+                self.next_due[url] = self._first_due(url, now)
+            self.feeds = new_feeds
+            if added:
+                self._cond.notify_all()
+        return result
+
+    def is_scheduled(self, url):
+        return url in self.feeds
+
+    def wait_for_due(self):
+        """Blochează până când cel puțin un feed e scadent; returnează feed-urile scadente."""
+        with self._cond:
+            while True:
+                now = time.time()
+                due = [feed for url, feed in self.feeds.items() if self.next_due.get(url, now) <= now]
+                if due:
+                    for feed in due:
+                        self.next_due[feed['url']] = IN_FLIGHT
+                    return due
+
+                pending = [when for when in self.next_due.values() if when != IN_FLIGHT]
+                self._cond.wait(timeout=max(0.0, min(pending) - now) if pending else None)
+
+    def reschedule(self, feeds, interval, not_before=None):
+        """Programează următoarea descărcare pentru feed-urile tocmai procesate.
+
+        `not_before(url)` poate amâna un feed peste interval (ex: circuit deschis).
+        """
+        with self._cond:
+            now = time.time()
+            self.interval = interval
+            for feed in feeds:
+                url = feed['url']
+                if url not in self.feeds:
+                    continue
+                self.last_fetch[url] = now
+                next_time = now + interval
+                if not_before is not None:
+                    later = not_before(url)
+                    if later is not None and later > next_time:
+                        next_time = later
+                self.next_due[url] = next_time
+            self._cond.notify_all()
+
+    def snapshot(self):
+        """{url: momentul ultimei descărcări}, pentru persistare."""
+        with self._cond:
+            return dict(self.last_fetch)
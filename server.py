@@ -1,12 +1,28 @@
 import socket
 import threading
+import hmac
 import json
 import time
+import calendar
 import feedparser
-import sqlite3
 import requests
 import ssl
 import os
+import signal
+from metrics import REGISTRY
+from storage import create_store
+from sharding import Coordinator
+from protocol import encode_feed, read_request, wants_binary
+from scheduler import FeedScheduler
+from config_watch import ConfigWatcher
+import config_store
+from health import HealthTracker
+from clustering import ClusterIndex, collapse
+from sanitize import SUMMARY_LENGTH, summarize_batch
+from filters import FilterIndex
+from tracing import Profiler, Tracer
+from admission import (AdmissionControl, WorkerPool, QUEUE_FULL, TOO_MANY_SUBSCRIBERS,
+                       busy_response, reject)
 
 HOST = '0.0.0.0'
 PORT = 5000
@@ -24,12 +40,81 @@ HEADERS = {
 
 # Variabile globale pentru configurare
 current_config = None
-last_config_check = 0
 
+# Planificatorul descărcărilor, sincronizat la fiecare reîncărcare a configurației
+scheduler = FeedScheduler()
 
-def create_default_config():
-    """Creează fișierul de configurare implicit dacă nu există."""
-    default_config = {
+# Backend-ul de stocare a articolelor (creat în init_db)
+store = None
+
+# Validatorii HTTP ai ultimului răspuns per feed (url -> {'etag', 'last_modified'}),
+# trimiși ca If-None-Match / If-Modified-Since; persistați împreună cu planificarea.
+# Conțin doar răspunsuri ale căror articole au fost salvate (vezi commit_validators)
+feed_validators = {}
+
+# Starea de sănătate a feed-urilor (circuit breaker), persistată în stocare
+health = HealthTracker()
+
+# Indexul LSH pentru gruparea știrilor duplicate din surse diferite
+cluster_index = ClusterIndex()
+
+# Filtrele de abonament (cuvinte cheie, expresii, surse), compilate împreună
+filter_index = FilterIndex()
+
+# Cache pentru răspunsurile GET_FEED*, invalidat când apar articole noi
+articles_generation = 0
+feed_response_cache = {}
+feed_cache_lock = threading.Lock()
+# Notificat la fiecare inserare de articole noi (pentru abonații SUBSCRIBE)
+articles_changed = threading.Condition(feed_cache_lock)
+
+# Intervalul heartbeat-ului trimis abonaților când nu apar articole noi
+SUBSCRIBE_HEARTBEAT = 15
+
+# Coordonatorul worker-ilor (doar în modul --coordinator)
+coordinator = None
+
+# Urmărirea etapelor (fișier Chrome trace) și profilarea la cerere; oprite implicit
+tracer = Tracer()
+profiler = Profiler()
+
+# Controlul admiterii și sloturile pentru abonamentele SUBSCRIBE (create în serve)
+admission = None
+subscriber_slots = None
+
+# Comenzile cunoscute (pentru a limita etichetele metricilor)
+KNOWN_COMMANDS = ('GET_FEED', 'GET_CONFIG', 'GET_METRICS',
+                  'REGISTER_WORKER', 'UNREGISTER_WORKER', 'INGEST', 'REPORT_HEALTH', 'SUBSCRIBE', 'RELOAD',
+                  'GET_HEALTH', 'GET_TIMELINE', 'GET_FEED_COLLAPSED',
+                  'SET_FILTER', 'DEL_FILTER', 'LIST_FILTERS', 'GET_FILTERED', 'TRACE', 'PROFILE')
+
+# Comenzile administrative sunt acceptate doar de la clienți locali; filtrele
+# sunt comune tuturor clienților, deci doar administratorul le poate modifica
+ADMIN_COMMANDS = ('RELOAD', 'TRACE', 'PROFILE', 'SET_FILTER', 'DEL_FILTER')
+
+# Metrici expuse prin comanda GET_METRICS
+FEED_FETCH_SECONDS = REGISTRY.histogram('rss_feed_fetch_seconds', 'Durata descărcării feed-ului', ('feed',))
+FEED_PARSE_SECONDS = REGISTRY.histogram('rss_feed_parse_seconds', 'Durata parsării feed-ului', ('feed',))
+FEED_SANITIZE_SECONDS = REGISTRY.histogram('rss_feed_sanitize_seconds', 'Durata extragerii rezumatelor text', ('feed',))
+FEED_INSERT_SECONDS = REGISTRY.histogram('rss_feed_insert_seconds', 'Durata inserării articolelor în baza de date', ('feed',))
+FEED_CLUSTER_SECONDS = REGISTRY.histogram('rss_feed_cluster_seconds', 'Durata grupării articolelor noi în clustere', ('feed',))
+FEED_FILTER_SECONDS = REGISTRY.histogram('rss_feed_filter_seconds', 'Durata evaluării filtrelor pe articolele noi', ('feed',))
+FEED_BYTES = REGISTRY.counter('rss_feed_bytes_total', 'Octeți descărcați per feed', ('feed',))
+FEED_NOT_MODIFIED = REGISTRY.counter('rss_feed_not_modified_total', 'Răspunsuri 304 (feed nemodificat)', ('feed',))
+FEED_ERRORS = REGISTRY.counter('rss_feed_errors_total', 'Erori per feed și etapă', ('feed', 'stage'))
+FILTER_MATCHES = REGISTRY.counter('rss_filter_matches_total', 'Potriviri ale filtrelor de abonament')
+ARTICLES_INSERTED = REGISTRY.counter('rss_articles_inserted_total', 'Articole noi inserate per feed', ('feed',))
+UPDATE_CYCLE_SECONDS = REGISTRY.histogram('rss_update_cycle_seconds', 'Durata unui ciclu complet de actualizare')
+CACHE_REQUESTS = REGISTRY.counter('rss_cache_requests_total', 'Accesări ale cache-urilor', ('cache', 'result'))
+ACTIVE_CONNECTIONS = REGISTRY.gauge('rss_active_connections', 'Conexiuni de client active')
+REJECTED_CONNECTIONS = REGISTRY.counter('rss_rejected_connections_total', 'Conexiuni refuzate cu "ocupat"', ('reason',))
+REQUEST_SECONDS = REGISTRY.histogram('rss_request_seconds', 'Latența cererilor de client per comandă', ('command',))
+
+
+def default_config():
+    """Configurația implicită."""
+    return {
+        "version": config_store.SCHEMA_VERSION,
         "feeds": [
             {
                 "name": "BBC News",
@@ -58,68 +143,41 @@ def create_default_config():
             "request_timeout": 15
         }
     }
-    
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(default_config, f, indent=2, ensure_ascii=False)
-    
+
+
+def create_default_config():
+    """Creează fișierul de configurare implicit dacă nu există."""
+    config = config_store.save_config(CONFIG_FILE, default_config())
     print(f"Fișier de configurare creat: {CONFIG_FILE}")
-    return default_config
+    return config
 
 
 def load_config():
-    """Încarcă configurația din fișier."""
+    """Încarcă configurația din fișier.
+
+    Dacă fișierul este invalid (ex: citit în timpul unei scrieri), se păstrează
+    ultima configurație validă; fișierul utilizatorului nu este suprascris.
+    """
     global current_config
     
-    try:
-        if not os.path.exists(CONFIG_FILE):
-            print("Fișierul de configurare nu există. Creez unul nou...")
-            current_config = create_default_config()
-            return current_config
-        
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            current_config = json.load(f)
-        
-        # Validează configurația
-        if not validate_config(current_config):
-            print("Configurarea este invalidă. Creez una nouă...")
-            current_config = create_default_config()
-        
-        print(f"Configurație încărcată: {len(current_config['feeds'])} feed-uri definite")
+    if not os.path.exists(CONFIG_FILE):
+        print("Fișierul de configurare nu există. Creez unul nou...")
+        current_config = create_default_config()
         return current_config
     
-    except Exception as e:
+    try:
+        current_config = config_store.load_config(CONFIG_FILE)
+    except config_store.ConfigError as e:
         print(f"Eroare la încărcarea configurației: {e}")
-        print("Creez configurație implicită...")
-        current_config = create_default_config()
+        if current_config is not None:
+            print("Păstrez ultima configurație validă")
+        else:
+            print("Folosesc configurația implicită (fișierul nu este modificat)")
+            current_config = default_config()
         return current_config
-
-
-def validate_config(config):
-    """Validează structura configurației."""
-    try:
-        # Verifică structura de bază
-        if not isinstance(config, dict):
-            return False
-        
-        if 'feeds' not in config or 'settings' not in config:
-            return False
-        
-        if not isinstance(config['feeds'], list):
-            return False
-        
-        # Verifică fiecare feed
-        for feed in config['feeds']:
-            if not isinstance(feed, dict):
-                return False
-            
-            required_keys = ['name', 'url', 'active']
-            if not all(key in feed for key in required_keys):
-                return False
-        
-        return True
     
-    except Exception:
-        return False
+    print(f"Configurație încărcată: {len(current_config['feeds'])} feed-uri definite")
+    return current_config
 
 
 def get_active_feeds():
@@ -137,178 +195,552 @@ def get_active_feeds():
     return active_feeds
 
 
-def reload_config_if_needed():
-    """Reîncarcă configurația dacă fișierul s-a schimbat."""
-    global current_config, last_config_check
+def reload_config():
+    """Reîncarcă configurația și aplică doar diferențele în planificator."""
+    load_config()
+    active_feeds = get_active_feeds()
+    changes = scheduler.sync(active_feeds)
     
-    try:
-        current_time = time.time()
-        
-        # Verifică doar la fiecare 30 de secunde
-        if current_time - last_config_check < 30:
-            return
-        
-        last_config_check = current_time
-        
-        if os.path.exists(CONFIG_FILE):
-            file_mtime = os.path.getmtime(CONFIG_FILE)
-            
-            # Dacă fișierul s-a modificat, reîncarcă-l
-            if not hasattr(reload_config_if_needed, 'last_mtime'):
-                reload_config_if_needed.last_mtime = file_mtime
-            
-            if file_mtime > reload_config_if_needed.last_mtime:
-                print("Configurația s-a schimbat. Reîncărcare...")
-                load_config()
-                reload_config_if_needed.last_mtime = file_mtime
+    for key, label in (('added', 'adăugate'), ('removed', 'eliminate'), ('changed', 'modificate')):
+        if changes[key]:
+            print(f"Feed-uri {label}: {', '.join(changes[key])}")
+    if not active_feeds:
+        print("Nu sunt feed-uri active în configurație!")
+    return changes
+
+
+def init_db():
+    """Inițializează backend-ul de stocare ales în setări."""
+    global store
     
+    settings = (current_config or {}).get('settings', {})
+    store = create_store(settings, DB_FILE)
+    store.init()
+    
+    health.store = store
+    health.base_backoff = settings.get('update_interval', 300)
+    health.failure_threshold = settings.get('failure_threshold', 3)
+    health.load()
+    
+    # Articolele recente sunt citite o singură dată pentru clustere și filtre
+    cluster_window = settings.get('cluster_window', 5000)
+    filter_backfill = settings.get('filter_backfill', 5000)
+    recent = store.latest(max(cluster_window, filter_backfill))
+    
+    # Indexul de clustere (MinHash pe fiecare articol) se reconstruiește în fundal,
+    # ca serverul să poată răspunde imediat; assign() așteaptă terminarea lui
+    cluster_index.threshold = settings.get('cluster_threshold', 0.5)
+    cluster_index.load_in_background(recent[:cluster_window])
+    
+    # Filtrele salvate se reaplică pe articolele recente
+    filter_index.window = settings.get('filter_window', 500)
+    filter_index.load(store.load_filters(), recent[:filter_backfill])
+    
+    # Planificarea reia de la ultimele descărcări, fără a le repeta pe toate la pornire
+    saved = store.load_feed_state()
+    for url, record in saved.items():
+        feed_validators[url] = {'etag': record['etag'], 'last_modified': record['last_modified']}
+    scheduler.restore({url: record['last_fetch'] for url, record in saved.items() if record['last_fetch']},
+                      settings.get('update_interval', 300), settings.get('restart_spread', 60))
+    return store
+
+
+def save_feed_state():
+    """Persistă momentul ultimei descărcări și validatorii HTTP ai fiecărui feed."""
+    last_fetch = scheduler.snapshot()
+    records = []
+    for url in set(last_fetch) | set(feed_validators):
+        validators = feed_validators.get(url, {})
+        records.append({'url': url, 'last_fetch': last_fetch.get(url),
+                        'etag': validators.get('etag'), 'last_modified': validators.get('last_modified')})
+    if not records or store is None:
+        return
+    try:
+        store.save_feed_state(records)
     except Exception as e:
-        print(f"Eroare la verificarea configurației: {e}")
+        print(f"Eroare la salvarea stării feed-urilor: {e}")
 
 
-def init_db():
-    """Inițializează baza de date."""
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''CREATE TABLE IF NOT EXISTS articles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT,
-            link TEXT,
-            published TEXT,
-            source TEXT,
-            description TEXT,
-            UNIQUE(title, link)
-        )''')
-        conn.commit()
-
-
-def fetch_feed_content(url, timeout=15):
-    """Descarcă conținutul feed-ului cu requests pentru a evita problemele SSL."""
+def commit_validators(url, validators):
+    """Reține validatorii unui răspuns după ce articolele lui au fost salvate.
+
+    Dacă ar fi reținuți înainte, o salvare eșuată ar fi urmată de un 304 și
+    articolele acelui răspuns nu ar mai fi descărcate niciodată.
+    """
+    if validators:
+        feed_validators[url] = validators
+
+
+def fetch_feed_content(url, timeout=15, feed_name=None):
+    """Descarcă conținutul feed-ului cu requests pentru a evita problemele SSL.
+
+    Cererea este condiționată de validatorii răspunsului anterior (ETag,
+    Last-Modified). Returnează (text, validatori noi); dacă feed-ul nu s-a
+    modificat (304) sau descărcarea eșuează returnează (None, None).
+    """
+    label = feed_name or url
+    headers = HEADERS
+    validators = feed_validators.get(url)
+    if validators:
+        headers = dict(HEADERS)
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    
+    start = time.perf_counter()
     try:
-        response = requests.get(url, headers=HEADERS, timeout=timeout, verify=False)
-        response.raise_for_status()
-        return response.text
+        with FEED_FETCH_SECONDS.time(feed=label):
+            # stream=True: requests.get revine după antete, deci conectarea
+            # (DNS, TCP, TLS, așteptarea serverului) se măsoară separat de descărcare
+            with tracer.span('connect', feed=label):
+                response = requests.get(url, headers=headers, timeout=timeout, verify=False, stream=True)
+                response.raise_for_status()
+            if response.status_code == 304:
+                response.close()
+                FEED_NOT_MODIFIED.inc(feed=label)
+                health.record_success(url, time.perf_counter() - start, response.status_code, feed_name)
+                print(f"Feed-ul {label} nu s-a modificat")
+                return None, None
+            with tracer.span('download', feed=label):
+                content = response.content
+        FEED_BYTES.inc(len(content), feed=label)
+        health.record_success(url, time.perf_counter() - start, response.status_code, feed_name)
+        validators = {'etag': response.headers.get('ETag'),
+                      'last_modified': response.headers.get('Last-Modified')}
+        return response.text, validators
     
     except requests.exceptions.RequestException as e:
+        status = e.response.status_code if e.response is not None else None
+        health.record_failure(url, time.perf_counter() - start, status, str(e), feed_name)
+        FEED_ERRORS.inc(feed=label, stage='fetch')
         print(f"Eroare la descărcarea feed-ului {url}: {e}")
-        return None
+        return None, None
+
+
+def fetch_articles(feed_config, settings):
+    """Descarcă și parsează un feed; returnează (lista de articole sau None, validatori).
+
+    Validatorii răspunsului se transmit lui commit_validators() doar după ce
+    articolele au fost salvate.
+    """
+    timeout = settings.get('request_timeout', 15)
+    max_articles = settings.get('max_articles_per_feed', 50)
+    feed_name = feed_config['name']
+    feed_url = feed_config['url']
+    
+    print(f"Procesez feed: {feed_name}")
+    
+    # Descarcă conținutul
+    feed_content, validators = fetch_feed_content(feed_url, timeout, feed_name)
+    if not feed_content:
+        return None, validators
+    
+    # Parsează cu feedparser
+    with FEED_PARSE_SECONDS.time(feed=feed_name), tracer.span('parse', feed=feed_name):
+        feed = feedparser.parse(feed_content)
+    
+    if not feed.entries:
+        print(f"Nu s-au găsit articole în feed-ul {feed_name}")
+        return None, validators
+    
+    # Limitează numărul de articole
+    entries_to_process = feed.entries[:max_articles]
+    
+    print(f"Procesez {len(entries_to_process)} articole de la {feed_name}")
+    
+    # Folosește numele din configurație în loc de feed.feed.title
+    fetched_at = int(time.time())
+    batch = []
+    with tracer.span('extract', feed=feed_name, entries=len(entries_to_process)):
+        for entry in entries_to_process:
+            batch.append({
+                'title': getattr(entry, 'title', 'Fără titlu'),
+                'link': getattr(entry, 'link', ''),
+                'published': getattr(entry, 'published', ''),
+                'source': feed_name,
+                'description': getattr(entry, 'description', ''),
+                'published_ts': entry_timestamp(entry, fetched_at),
+            })
+    return batch, validators
+
+
+def entry_timestamp(entry, fetched_at):
+    """Data publicării ca epoch UTC, calculată o singură dată la ingestie.
+
+    Folosește published_parsed/updated_parsed de la feedparser; dacă lipsesc
+    sau sunt în viitor, se folosește momentul descărcării.
+    """
+    parsed = getattr(entry, 'published_parsed', None) or getattr(entry, 'updated_parsed', None)
+    if not parsed:
+        return fetched_at
+    return min(calendar.timegm(parsed), fetched_at)
+
+
+def store_articles(feed_name, batch):
+    """Inserează lotul unui feed în stocare; returnează articolele noi."""
+    global articles_generation
+    
+    # HTML-ul descrierilor devine rezumat text simplu, o singură dată per lot
+    settings = (current_config or {}).get('settings', {})
+    with FEED_SANITIZE_SECONDS.time(feed=feed_name), tracer.span('sanitize', feed=feed_name):
+        summarize_batch(batch, settings.get('summary_length', SUMMARY_LENGTH),
+                        keep_html=settings.get('keep_raw_html', False))
+    
+    with FEED_INSERT_SECONDS.time(feed=feed_name):
+        with tracer.span('insert', feed=feed_name, articles=len(batch)):
+            new_articles = store.insert_batch(
+                batch, on_error=lambda e: FEED_ERRORS.inc(feed=feed_name, stage='insert'))
+    if new_articles:
+        # Atribuie cluster_id (aceeași știre din alte surse) o singură dată, la ingestie
+        with FEED_CLUSTER_SECONDS.time(feed=feed_name):
+            with tracer.span('cluster', feed=feed_name, articles=len(new_articles)):
+                store.set_clusters(cluster_index.assign(new_articles))
+        # Filtrele tuturor abonaților sunt evaluate o singură dată, aici
+        with FEED_FILTER_SECONDS.time(feed=feed_name):
+            with tracer.span('filter', feed=feed_name, articles=len(new_articles)):
+                FILTER_MATCHES.inc(filter_index.add(new_articles))
+    
+    ARTICLES_INSERTED.inc(len(new_articles), feed=feed_name)
+    if new_articles:
+        # Invalidează cache-ul răspunsului GET_FEED și anunță abonații
+        with articles_changed:
+            articles_generation += 1
+            articles_changed.notify_all()
+    print(f"Adăugate {len(new_articles)} articole noi de la {feed_name}")
+    return new_articles
+
+
+def update_cycle(active_feeds, settings, is_active=None):
+    """Rulează un singur ciclu de actualizare pentru feed-urile date.
+
+    `is_active(url)` permite sărirea feed-urilor dezactivate între timp.
+    Returnează numărul de articole noi inserate.
+    """
+    cycle_start = time.perf_counter()
+    total_new_articles = 0
+    
+    with profiler.cycle(), tracer.span('update_cycle', feeds=len(active_feeds)):
+        for feed_config in active_feeds:
+            if is_active is not None and not is_active(feed_config['url']):
+                continue
+            try:
+                with tracer.span('feed', feed=feed_config.get('name')):
+                    batch, validators = fetch_articles(feed_config, settings)
+                    if batch:
+                        total_new_articles += len(store_articles(feed_config['name'], batch))
+                    commit_validators(feed_config['url'], validators)
+                
+            except Exception as e:
+                FEED_ERRORS.inc(feed=feed_config.get('name', 'necunoscut'), stage='process')
+                print(f"Eroare la procesarea feed-ului {feed_config.get('name', 'necunoscut')}: {e}")
+        
+        # Retenție opțională: păstrează doar cele mai noi N articole
+        max_total = settings.get('max_articles_total')
+        if max_total:
+            with tracer.span('retention'):
+                removed = store.apply_retention(max_total)
+            if removed:
+                print(f"Retenție: șterse {removed} articole vechi")
+    
+    tracer.flush()
+    print(f"Actualizare completă: {total_new_articles} articole noi în total")
+    UPDATE_CYCLE_SECONDS.observe(time.perf_counter() - cycle_start)
+    return total_new_articles
 
 
 def update_feeds():
-    """Actualizează feed-urile în buclă."""
-    global current_config
+    """Descarcă feed-urile pe măsură ce devin scadente."""
+    scheduler.sync(get_active_feeds())
     
     while True:
         try:
-            # Reîncarcă configurația dacă s-a schimbat
-            reload_config_if_needed()
-            
-            # Obține feed-urile active
-            active_feeds = get_active_feeds()
-            
-            if not active_feeds:
-                print("Nu sunt feed-uri active în configurație!")
-                time.sleep(60)
-                continue
+            # Așteaptă până când cel puțin un feed este scadent
+            due_feeds = scheduler.wait_for_due()
+            settings = current_config.get('settings', {})
+            update_interval = settings.get('update_interval', 300)
             
-            print(f"Începem actualizarea pentru {len(active_feeds)} feed-uri active la {time.strftime('%H:%M:%S')}")
+            # Feed-urile cu circuitul deschis sunt amânate până la următoarea probă
+            allowed_feeds = [feed for feed in due_feeds if health.allow(feed['url'])]
             
-            # Obține setările
-            settings = current_config.get('settings', {})
-            timeout = settings.get('request_timeout', 15)
-            max_articles = settings.get('max_articles_per_feed', 50)
+            print(f"Începem actualizarea pentru {len(allowed_feeds)} feed-uri active la {time.strftime('%H:%M:%S')}")
             
-            with sqlite3.connect(DB_FILE) as conn:
-                cursor = conn.cursor()
-                total_new_articles = 0
-                
-                for feed_config in active_feeds:
-                    try:
-                        feed_name = feed_config['name']
-                        feed_url = feed_config['url']
-                        
-                        print(f"Procesez feed: {feed_name}")
-                        
-                        # Descarcă conținutul
-                        feed_content = fetch_feed_content(feed_url, timeout)
-                        if not feed_content:
-                            continue
-                        
-                        # Parsează cu feedparser
-                        feed = feedparser.parse(feed_content)
-                        
-                        if not feed.entries:
-                            print(f"Nu s-au găsit articole în feed-ul {feed_name}")
-                            continue
-                        
-                        # Limitează numărul de articole
-                        entries_to_process = feed.entries[:max_articles]
-                        
-                        print(f"Procesez {len(entries_to_process)} articole de la {feed_name}")
-                        
-                        new_articles_count = 0
-                        for entry in entries_to_process:
-                            try:
-                                title = getattr(entry, 'title', 'Fără titlu')
-                                link = getattr(entry, 'link', '')
-                                published = getattr(entry, 'published', '')
-                                description = getattr(entry, 'description', '')
-                                
-                                # Folosește numele din configurație în loc de feed.feed.title
-                                cursor.execute('''INSERT OR IGNORE INTO articles 
-                                                (title, link, published, source, description)
-                                                VALUES (?, ?, ?, ?, ?)''',
-                                             (title, link, published, feed_name, description))
-                                
-                                if cursor.rowcount > 0:
-                                    new_articles_count += 1
-                                    
-                            except Exception as e:
-                                print(f"Eroare la inserarea articolului: {e}")
-                        
-                        total_new_articles += new_articles_count
-                        print(f"Adăugate {new_articles_count} articole noi de la {feed_name}")
-                        
-                    except Exception as e:
-                        print(f"Eroare la procesarea feed-ului {feed_config.get('name', 'necunoscut')}: {e}")
-                
-                conn.commit()
-                print(f"Actualizare completă: {total_new_articles} articole noi în total")
+            try:
+                update_cycle(allowed_feeds, settings, is_active=scheduler.is_scheduled)
+            finally:
+                scheduler.reschedule(due_feeds, update_interval, not_before=health.retry_at)
+                save_feed_state()
             
-            # Folosește intervalul din configurație
-            update_interval = settings.get('update_interval', 300)
             print(f"Următoarea actualizare în {update_interval} secunde...")
-            time.sleep(update_interval)
             
         except Exception as e:
             print(f"Eroare critică în update_feeds: {e}")
             time.sleep(60)  # Așteaptă 1 minut înainte de a încerca din nou
 
 
-def handle_client(conn, addr):
-    """Gestionează cererile clienților."""
+def build_feed_payload(binary=False):
+    """Construiește răspunsul GET_FEED (ultimele 50 de articole după data publicării) ca bytes."""
+    articles = store.timeline(50)
+    return encode_feed(articles, binary=binary), len(articles)
+
+
+def build_collapsed_payload(limit=50, binary=False):
+    """Răspunsul GET_FEED_COLLAPSED: câte un articol reprezentativ per știre."""
+    articles = []
+    clusters = set()
+    before = before_id = None
+    # Citește cronologia pe pagini până se strâng `limit` știri distincte;
+    # cursorul (published_ts, id) nu sare articolele cu aceeași dată
+    for _ in range(10):
+        page = store.timeline(limit * 4, before, before_id)
+        articles.extend(page)
+        clusters.update(article['cluster_id'] or article['id'] for article in page)
+        if len(page) < limit * 4 or len(clusters) >= limit or page[-1]['published_ts'] is None:
+            break
+        before, before_id = page[-1]['published_ts'], page[-1]['id']
+    
+    representatives = collapse(articles, limit)
+    return encode_feed(representatives, extra_fields=('related',), binary=binary), len(representatives)
+
+
+# Vederile cache-uite: numele cache-ului -> funcția care construiește răspunsul
+FEED_VIEWS = {
+    'get_feed': build_feed_payload,
+    'collapsed': build_collapsed_payload,
+}
+
+
+def get_feed_payload(view='get_feed', binary=False):
+    """Returnează răspunsul unei vederi (JSON sau binar) din cache sau îl reconstruiește."""
+    generation = articles_generation
+    key = (view, binary)
+    with feed_cache_lock:
+        cached = feed_response_cache.get(key)
+        if cached and cached[0] == generation:
+            CACHE_REQUESTS.inc(cache=view, result='hit')
+            return cached[1], cached[2]
+    
+    CACHE_REQUESTS.inc(cache=view, result='miss')
+    payload, count = FEED_VIEWS[view](binary=binary)
+    with feed_cache_lock:
+        feed_response_cache[key] = (generation, payload, count)
+    return payload, count
+
+
+def warm_feed_cache():
+    """Construiește din baza de date toate vederile cache-uite (JSON și binar).
+
+    Apelată la pornire, înainte de acceptarea conexiunilor, ca primii
+    clienți să primească răspunsul din cache.
+    """
+    for view in FEED_VIEWS:
+        for binary in (False, True):
+            get_feed_payload(view, binary)
+
+
+def public_settings():
+    """Setările trimise clienților și worker-ilor, fără secretul worker-ilor."""
+    return {key: value for key, value in current_config['settings'].items() if key != 'worker_secret'}
+
+
+def authorize_worker(addr, secret):
+    """Verifică secretul unui worker (setarea 'worker_secret').
+
+    Fără secret configurat sunt acceptați doar worker-ii de pe mașina locală.
+    """
+    expected = current_config['settings'].get('worker_secret')
+    if not expected:
+        return is_local_client(addr)
+    return isinstance(secret, str) and hmac.compare_digest(secret.encode(), str(expected).encode())
+
+
+def check_worker_request(request, addr):
+    """Verifică o cerere INGEST/REPORT_HEALTH; returnează mesajul de eroare sau None."""
+    if not isinstance(request, dict):
+        return 'Corpul trebuie să fie un obiect JSON'
+    if not authorize_worker(addr, request.get('secret')):
+        return 'Worker neautorizat'
+    if not coordinator.is_registered(request.get('worker'), addr[0]):
+        return 'Worker neînregistrat de la această adresă (trimiteți întâi REGISTER_WORKER)'
+    return None
+
+
+def handle_ingest(body, addr):
+    """Primește articolele parsate de un worker înregistrat și le salvează."""
+    request = json.loads(body.decode())
+    error = check_worker_request(request, addr)
+    if error:
+        return {'error': error}
+    feed_name = request.get('feed')
+    if feed_name not in {feed['name'] for feed in get_active_feeds()}:
+        return {'error': f"Feed necunoscut sau inactiv: {feed_name}"}
+    received_at = int(time.time())
+    batch = []
+    for article in request.get('articles', []):
+        published_ts = article.get('published_ts')
+        batch.append({
+            'title': article.get('title', 'Fără titlu'),
+            'link': article.get('link', ''),
+            'published': article.get('published', ''),
+            'source': feed_name,
+            'description': article.get('description', ''),
+            'published_ts': published_ts if isinstance(published_ts, int) else received_at,
+        })
+    return {'inserted': len(store_articles(feed_name, batch)) if batch else 0}
+
+
+def handle_health_report(body, addr):
+    """Preia starea feed-urilor descărcate de un worker (pentru GET_HEALTH și repornire)."""
+    request = json.loads(body.decode())
+    error = check_worker_request(request, addr)
+    if error:
+        return {'error': error}
+    active_urls = {feed['url'] for feed in get_active_feeds()}
+    recorded = 0
+    for record in request.get('feeds', []):
+        if isinstance(record, dict) and record.get('url') in active_urls:
+            health.update(record)
+            recorded += 1
+    return {'recorded': recorded}
+
+
+def handle_set_filter(body):
+    """Creează sau înlocuiește un filtru și îl aplică pe articolele recente."""
+    request = json.loads(body.decode())
+    if not isinstance(request, dict):
+        return {'error': 'Corpul trebuie să fie un obiect JSON'}
+    name = request.get('name')
+    settings = (current_config or {}).get('settings', {})
     try:
-        data = conn.recv(1024).decode().strip()
-        if data == 'GET_FEED':
-            with sqlite3.connect(DB_FILE) as db:
-                cursor = db.cursor()
-                cursor.execute('''SELECT title, link, published, source, description 
-                                FROM articles ORDER BY id DESC LIMIT 50''')
-                rows = cursor.fetchall()
-                
-                articles = []
-                for row in rows:
-                    articles.append({
-                        'title': row[0],
-                        'link': row[1],
-                        'published': row[2],
-                        'source': row[3],
-                        'description': row[4]
-                    })
-                
-                payload = json.dumps({'articles': articles})
-                conn.sendall(payload.encode())
-                print(f"Trimise {len(articles)} articole către client {addr}")
+        rules = filter_index.set(name, request, store.latest(settings.get('filter_backfill', 5000)))
+    except ValueError as e:
+        return {'error': str(e)}
+    store.save_filter(name, rules)
+    print(f"Filtru salvat: {name}")
+    return {'name': name, 'rules': rules, 'matches': filter_index.snapshot()[name]['matches']}
+
+
+def send_article_lines(conn, articles):
+    """Trimite articolele ca JSON, câte unul pe linie."""
+    if articles:
+        conn.sendall(b''.join(json.dumps(article).encode() + b'\n' for article in articles))
+
+
+def stream_articles(conn, args):
+    """Trimite continuu articolele noi unui relay abonat (vezi relay.py).
+
+    'SUBSCRIBE <cursor>' trimite articolele cu id > cursor, iar 'SUBSCRIBE -N'
+    începe cu ultimele N articole. Cu 'SUBSCRIBE <cursor> <filtru>' se trimit
+    doar articolele potrivite filtrului, deja calculate la ingestie. Când nu
+    apar articole noi se trimite periodic un heartbeat, ca relay-ul să poată
+    detecta conexiunile moarte.
+    """
+    cursor = int(args[0]) if args else 0
+    filter_name = args[1] if len(args) > 1 else None
+    if filter_name is not None and filter_name not in filter_index:
+        conn.sendall(json.dumps({'error': f'Filtrul {filter_name} nu există'}).encode() + b'\n')
+        return
+    
+    if cursor < 0:
+        if filter_name is None:
+            backlog = store.latest(-cursor)
+            backlog.reverse()
+        else:
+            backlog = sorted(filter_index.latest(filter_name, -cursor), key=lambda article: article['id'])
+        send_article_lines(conn, backlog)
+        cursor = backlog[-1]['id'] if backlog else 0
+    
+    while True:
+        generation = articles_generation
+        if filter_name is None:
+            batch = store.since(cursor, 500)
+        elif filter_name in filter_index:
+            batch = filter_index.since(filter_name, cursor, 500)
+        else:
+            return  # filtrul a fost șters
+        
+        if batch:
+            send_article_lines(conn, batch)
+            cursor = batch[-1]['id']
+            continue
+        
+        with articles_changed:
+            changed = articles_changed.wait_for(lambda: articles_generation != generation,
+                                                timeout=SUBSCRIBE_HEARTBEAT)
+        if not changed:
+            conn.sendall(json.dumps({'heartbeat': int(time.time())}).encode() + b'\n')
+
+
+def is_local_client(addr):
+    """Verifică dacă conexiunea vine de pe mașina locală."""
+    host = addr[0] if isinstance(addr, tuple) else ''
+    return host in ('127.0.0.1', '::1') or host.startswith('::ffff:127.')
+
+
+def is_exempt_address(ip):
+    """Adresele fără limite per IP: clienții locali și worker-ii înregistrați."""
+    return is_local_client((ip,)) or (coordinator is not None and coordinator.is_worker_address(ip))
+
+
+def close_client(conn, addr, counted):
+    conn.close()
+    ACTIVE_CONNECTIONS.dec()
+    if counted and admission is not None:
+        admission.release(addr[0])
+
+
+def start_subscription(conn, addr, args, counted):
+    """Mută un abonament SUBSCRIBE pe un thread propriu, ca să nu țină ocupat pool-ul.
+
+    Returnează True dacă thread-ul a preluat conexiunea (și închiderea ei).
+    """
+    if not subscriber_slots.acquire(blocking=False):
+        REJECTED_CONNECTIONS.inc(reason=TOO_MANY_SUBSCRIBERS)
+        conn.sendall(busy_response(TOO_MANY_SUBSCRIBERS, retry_after=SUBSCRIBE_HEARTBEAT))
+        return False
+    
+    def run():
+        try:
+            print(f"Relay abonat: {addr}")
+            stream_articles(conn, args)
+        except Exception as e:
+            print(f"Abonament încheiat pentru {addr}: {e}")
+        finally:
+            subscriber_slots.release()
+            close_client(conn, addr, counted)
+    
+    threading.Thread(target=run, daemon=True).start()
+    return True
+
+
+def handle_client(conn, addr, counted=False):
+    """Gestionează cererile clienților.
+
+    `counted`: conexiunea a fost numărată de controlul admiterii (vezi serve).
+    """
+    ACTIVE_CONNECTIONS.inc()
+    command = 'unknown'
+    request_start = None
+    handed_off = False
+    settings = (current_config or {}).get('settings', {})
+    try:
+        # Termene de citire/scriere: un client tăcut sau lent nu blochează thread-ul
+        deadline = time.monotonic() + settings.get('client_read_timeout', 10)
+        data, args, body = read_request(conn, deadline)
+        conn.settimeout(settings.get('client_write_timeout', 30))
+        request_start = time.perf_counter()
+        # 'BIN' la final: răspunsurile cu articole în formatul binar (vezi codec.py)
+        binary = wants_binary(args)
+        if data in KNOWN_COMMANDS:
+            command = data
+        
+        if data in ADMIN_COMMANDS and not is_local_client(addr):
+            conn.sendall(json.dumps({'error': 'Comandă permisă doar local'}).encode())
+        
+        elif data == 'GET_FEED':
+            payload, count = get_feed_payload(binary=binary)
+            conn.sendall(payload)
+            print(f"Trimise {count} articole către client {addr}")
         
         elif data == 'GET_CONFIG':
             # Opțional: permite clientului să vadă configurația
@@ -316,10 +748,119 @@ def handle_client(conn, addr):
             config_info = {
                 'active_feeds': [{'name': f['name'], 'url': f['url']} for f in active_feeds],
                 'total_feeds': len(current_config['feeds']),
-                'settings': current_config['settings']
+                'settings': public_settings()
             }
             payload = json.dumps(config_info)
             conn.sendall(payload.encode())
+        
+        elif data == 'GET_METRICS':
+            # Metrici în formatul text Prometheus
+            conn.sendall(REGISTRY.render().encode())
+        
+        elif data in ('REGISTER_WORKER', 'UNREGISTER_WORKER'):
+            # 'REGISTER_WORKER <id> [secret]': doar worker-ii autorizați primesc un shard
+            if coordinator is None or not args:
+                conn.sendall(json.dumps({'error': 'Serverul nu rulează în modul coordonator'}).encode())
+            elif not authorize_worker(addr, args[1] if len(args) > 1 else None):
+                conn.sendall(json.dumps({'error': 'Worker neautorizat'}).encode())
+            elif data == 'REGISTER_WORKER':
+                # Înregistrare/heartbeat: răspunde cu shard-ul curent al worker-ului
+                coordinator.heartbeat(args[0], addr[0])
+                status = coordinator.status()
+                response = {
+                    'feeds': coordinator.shard_for(args[0], get_active_feeds()),
+                    'settings': public_settings(),
+                    'workers': len(status['workers']),
+                    'version': status['version'],
+                }
+                conn.sendall(json.dumps(response).encode())
+            else:
+                coordinator.leave(args[0])
+                conn.sendall(json.dumps({'ok': True}).encode())
+        
+        elif data == 'INGEST':
+            # Worker-ul reîncearcă lotul doar dacă află că nu a fost salvat
+            try:
+                if coordinator is None:
+                    response = {'error': 'Serverul nu rulează în modul coordonator'}
+                else:
+                    response = handle_ingest(body, addr)
+            except Exception as e:
+                print(f"Eroare la INGEST de la {addr}: {e}")
+                response = {'error': f"Lotul nu a fost salvat: {e}"}
+            conn.sendall(json.dumps(response).encode())
+        
+        elif data == 'REPORT_HEALTH':
+            # Circuit breaker-ul rulează în worker-i; coordonatorul păstrează starea raportată
+            try:
+                if coordinator is None:
+                    response = {'error': 'Serverul nu rulează în modul coordonator'}
+                else:
+                    response = handle_health_report(body, addr)
+            except Exception as e:
+                print(f"Eroare la REPORT_HEALTH de la {addr}: {e}")
+                response = {'error': f"Starea nu a fost salvată: {e}"}
+            conn.sendall(json.dumps(response).encode())
+        
+        elif data == 'GET_FEED_COLLAPSED':
+            # Știrile duplicate din mai multe surse apar o singură dată
+            payload, count = get_feed_payload('collapsed', binary=binary)
+            conn.sendall(payload)
+            print(f"Trimise {count} știri (grupate) către client {addr}")
+        
+        elif data == 'GET_TIMELINE':
+            # 'GET_TIMELINE [limită] [published_ts] [id]': cronologie paginată; pagina
+            # următoare se cere cu published_ts și id-ul ultimului articol primit
+            limit = min(int(args[0]), 500) if args else 50
+            before = int(args[1]) if len(args) > 1 else None
+            before_id = int(args[2]) if len(args) > 2 else None
+            conn.sendall(encode_feed(store.timeline(limit, before, before_id), binary=binary))
+        
+        elif data == 'GET_HEALTH':
+            # Starea feed-urilor: eșecuri, latență, circuit breaker
+            conn.sendall(json.dumps({'feeds': health.snapshot()}).encode())
+        
+        elif data == 'RELOAD':
+            # Reîncărcare imediată, fără a aștepta notificarea de la fișier
+            conn.sendall(json.dumps(reload_config()).encode())
+        
+        elif data == 'TRACE':
+            # 'TRACE on|off': urmărirea etapelor în fișierul de trace
+            if args and args[0] in ('on', 'off'):
+                tracer.set_enabled(args[0] == 'on')
+            conn.sendall(json.dumps({'enabled': tracer.enabled, 'file': tracer.path}).encode())
+        
+        elif data == 'PROFILE':
+            # 'PROFILE [N]': cProfile pe următoarele N cicluri de actualizare
+            cycles = profiler.request(int(args[0]) if args else 1)
+            conn.sendall(json.dumps({'cycles': cycles, 'output_dir': profiler.output_dir,
+                                     'last_output': profiler.last_output}).encode())
+        
+        elif data == 'SUBSCRIBE':
+            handed_off = start_subscription(conn, addr, args, counted)
+        
+        elif data == 'SET_FILTER':
+            # Corp: {"name": ..., "include": {...}, "exclude": {...}} (vezi filters.py)
+            conn.sendall(json.dumps(handle_set_filter(body)).encode())
+        
+        elif data == 'DEL_FILTER':
+            removed = bool(args) and filter_index.remove(args[0])
+            if removed:
+                store.delete_filter(args[0])
+            conn.sendall(json.dumps({'removed': removed}).encode())
+        
+        elif data == 'LIST_FILTERS':
+            conn.sendall(json.dumps({'filters': filter_index.snapshot()}).encode())
+        
+        elif data == 'GET_FILTERED':
+            # 'GET_FILTERED <filtru> [limită]': doar articolele potrivite filtrului
+            if not args or args[0] not in filter_index:
+                conn.sendall(json.dumps({'error': 'Filtru necunoscut'}).encode())
+            else:
+                limit = min(int(args[1]), 500) if len(args) > 1 else 50
+                articles = filter_index.latest(args[0], limit)
+                conn.sendall(encode_feed(articles, binary=binary))
+                print(f"Trimise {len(articles)} articole (filtrul {args[0]}) către client {addr}")
             
         else:
             conn.sendall(json.dumps({'error': 'Comanda necunoscută'}).encode())
@@ -327,11 +868,86 @@ def handle_client(conn, addr):
     except Exception as e:
         print(f"Eroare la client {addr}: {e}")
     finally:
-        conn.close()
+        if not handed_off:
+            close_client(conn, addr, counted)
+        if request_start is not None:
+            REQUEST_SECONDS.observe(time.perf_counter() - request_start, command=command)
+
 
+def serve(s):
+    """Acceptă conexiuni pe socket-ul dat și le împarte unui pool limitat de thread-uri.
 
-def start_server():
-    """Pornește serverul."""
+    Conexiunile peste limite (coadă plină, prea multe conexiuni sau cereri de
+    la aceeași adresă) primesc imediat un răspuns "ocupat" (vezi admission.py).
+    """
+    global admission, subscriber_slots
+    
+    settings = (current_config or {}).get('settings', {})
+    admission = AdmissionControl(max_connections_per_ip=settings.get('max_connections_per_ip', 16),
+                                 rate=settings.get('rate_limit_per_ip', 20),
+                                 burst=settings.get('rate_limit_burst', 40),
+                                 exempt=is_exempt_address)
+    subscriber_slots = threading.BoundedSemaphore(settings.get('max_subscribers', 64))
+    pool = WorkerPool(handle_client, workers=settings.get('client_threads', 32),
+                      queue_size=settings.get('connection_queue', 256), name='client').start()
+    
+    while True:
+        try:
+            conn, addr = s.accept()
+        except OSError:
+            # Socket-ul a fost închis; oprește bucla
+            break
+        reason, counted = admission.admit(addr[0])
+        if reason is None and not pool.submit(conn, addr, counted):
+            if counted:
+                admission.release(addr[0])
+            reason = QUEUE_FULL
+        if reason is not None:
+            REJECTED_CONNECTIONS.inc(reason=reason)
+            reject(conn, reason)
+
+
+def configure_tracing(settings):
+    """Aplică setările de urmărire/profilare (trace_file, trace_max_bytes, trace_enabled, profile_dir)."""
+    tracer.path = settings.get('trace_file', 'rss_trace.json')
+    tracer.max_bytes = settings.get('trace_max_bytes', 10 * 1024 * 1024)
+    tracer.set_enabled(bool(settings.get('trace_enabled', False)))
+    profiler.output_dir = settings.get('profile_dir', '.')
+
+
+def install_signal_handlers(settings):
+    """SIGUSR1 pornește/oprește urmărirea, SIGUSR2 profilează următoarele cicluri (doar POSIX).
+
+    SIGTERM oprește serverul ordonat (starea feed-urilor este salvată).
+    """
+    def terminate(signum, frame):
+        raise SystemExit(0)
+    
+    signal.signal(signal.SIGTERM, terminate)
+    if not hasattr(signal, 'SIGUSR1'):
+        return
+    
+    def toggle_trace(signum, frame):
+        enabled = tracer.set_enabled(not tracer.enabled)
+        print(f"Urmărire {'pornită' if enabled else 'oprită'}: {tracer.path}")
+    
+    def request_profile(signum, frame):
+        cycles = profiler.request(settings.get('profile_cycles', 1))
+        print(f"Profilez următoarele {cycles} cicluri")
+    
+    signal.signal(signal.SIGUSR1, toggle_trace)
+    signal.signal(signal.SIGUSR2, request_profile)
+
+
+def start_server(coordinator_mode=False):
+    """Pornește serverul.
+
+    În modul coordonator serverul nu descarcă feed-uri: le împarte între
+    worker-i (vezi worker.py) și primește articolele prin INGEST.
+    """
+    global coordinator
+    
+    started = time.perf_counter()
     print("=== RSS FEED SERVER ===")
     print("Încărcare configurație...")
     load_config()
@@ -339,8 +955,23 @@ def start_server():
     print("Inițializez baza de date...")
     init_db()
     
-    print("Pornesc thread-ul de actualizare feed-uri...")
-    threading.Thread(target=update_feeds, daemon=True).start()
+    settings = current_config.get('settings', {})
+    configure_tracing(settings)
+    install_signal_handlers(settings)
+    
+    # Răspunsurile GET_FEED* sunt gata înainte de primul client
+    warm_feed_cache()
+    
+    watcher = ConfigWatcher(CONFIG_FILE, reload_config).start()
+    print(f"Urmăresc modificările configurației ({watcher.mode})")
+    
+    if coordinator_mode:
+        worker_timeout = current_config['settings'].get('worker_timeout', 30)
+        coordinator = Coordinator(worker_timeout=worker_timeout)
+        print("Mod coordonator: feed-urile sunt împărțite între worker-i")
+    else:
+        print("Pornesc thread-ul de actualizare feed-uri...")
+        threading.Thread(target=update_feeds, daemon=True).start()
     
     print(f"Pornesc serverul pe {HOST}:{PORT}...")
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
@@ -352,16 +983,29 @@ def start_server():
         print(f"  Baza de date: {DB_FILE}")
         print(f" Feed-uri active: {len(get_active_feeds())}")
         print("\n Pentru a schimba feed-urile, editează fișierul feeds_config.json")
-        print(" Serverul va reîncărca automat configurația la modificări\n")
+        print(" Serverul va reîncărca automat configurația la modificări (sau trimite RELOAD)\n")
+        print(f"Gata de conexiuni în {time.perf_counter() - started:.2f} secunde")
         
-        while True:
-            conn, addr = s.accept()
-            threading.Thread(target=handle_client, args=(conn, addr), daemon=True).start()
+        try:
+            serve(s)
+        finally:
+            # Repornirea următoare reia planificarea și cererile condiționate de aici
+            save_feed_state()
+            print("Starea feed-urilor a fost salvată")
 
 
 if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Server RSS")
+    parser.add_argument('--port', type=int, default=PORT, help="portul de ascultare")
+    parser.add_argument('--coordinator', action='store_true',
+                        help="împarte feed-urile între worker-i în loc să le descarce local")
+    args = parser.parse_args()
+    PORT = args.port
+    
     # Dezactivează warnings pentru SSL
     import urllib3
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
     
-    start_server()
\ No newline at end of file
+    start_server(coordinator_mode=args.coordinator)
\ No newline at end of file
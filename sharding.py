@@ -0,0 +1,112 @@
+import bisect
+import hashlib
+import threading
+import time
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """Inel de hashing consistent: fiecare nod are `replicas` puncte virtuale.
+
+    La adăugarea sau eliminarea unui nod se mută doar cheile din vecinătatea
+    punctelor lui, restul feed-urilor rămân la același worker.
+    """
+
+    def __init__(self, nodes=(), replicas=100):
+        self.replicas = replicas
+        self._points = []
+        self._owners = []
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        keep = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in keep]
+        self._owners = [o for _, o in keep]
+
+    def node_for(self, key):
+        """Returnează nodul responsabil pentru cheie (None dacă inelul e gol)."""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class Coordinator:
+    """Ține evidența worker-ilor activi și împarte feed-urile între ei după URL."""
+
+    def __init__(self, worker_timeout=30, replicas=100):
+        self.worker_timeout = worker_timeout
+        self.ring = HashRing(replicas=replicas)
+        self.last_seen = {}
+        self.addresses = {}     # worker -> adresa IP de la ultimul heartbeat
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        for worker_id, seen in list(self.last_seen.items()):
+            if now - seen > self.worker_timeout:
+                print(f"Worker expirat: {worker_id}")
+                del self.last_seen[worker_id]
+                self.addresses.pop(worker_id, None)
+                self.ring.remove(worker_id)
+                self.version += 1
+
+    def heartbeat(self, worker_id, address=None):
+        """Înregistrează (sau reîmprospătează) un worker."""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if worker_id not in self.last_seen:
+                print(f"Worker nou: {worker_id}")
+                self.ring.add(worker_id)
+                self.version += 1
+            self.last_seen[worker_id] = now
+            if address is not None:
+                self.addresses[worker_id] = address
+
+    def leave(self, worker_id):
+        with self._lock:
+            self.addresses.pop(worker_id, None)
+            if self.last_seen.pop(worker_id, None) is not None:
+                print(f"Worker plecat: {worker_id}")
+                self.ring.remove(worker_id)
+                self.version += 1
+
+    def is_registered(self, worker_id, address):
+        """Worker-ul este activ și s-a înregistrat de la adresa dată."""
+        with self._lock:
+            self._expire(time.time())
+            return worker_id in self.last_seen and self.addresses.get(worker_id) == address
+
+    def is_worker_address(self, address):
+        """Adresa aparține unui worker înregistrat și activ."""
+        with self._lock:
+            return address in self.addresses.values()
+
+    def shard_for(self, worker_id, feeds):
+        """Feed-urile (din lista dată) care îi revin worker-ului."""
+        with self._lock:
+            self._expire(time.time())
+            return [feed for feed in feeds if self.ring.node_for(feed['url']) == worker_id]
+
+    def status(self):
+        with self._lock:
+            return {'workers': sorted(self.last_seen), 'version': self.version}
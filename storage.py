@@ -0,0 +1,542 @@
+import heapq
+import json
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from email.utils import mktime_tz, parsedate_tz
+
+from health import HEALTH_FIELDS
+from sanitize import summarize
+from scheduler import FEED_STATE_FIELDS
+
+# Coloanele returnate pentru fiecare articol
+ARTICLE_FIELDS = ('id', 'title', 'link', 'published', 'source', 'description', 'published_ts',
+                  'cluster_id', 'summary')
+INSERT_FIELDS = ARTICLE_FIELDS[1:]
+SELECT_ARTICLES = f"SELECT {', '.join(ARTICLE_FIELDS)} FROM articles"
+
+
+def parse_published(text):
+    """Convertește o dată RFC 822 sau ISO 8601 în epoch UTC (None dacă nu se poate)."""
+    if not text:
+        return None
+    parsed = parsedate_tz(text)
+    if parsed:
+        return mktime_tz(parsed)
+    try:
+        return int(datetime.fromisoformat(text.strip().replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        return None
+
+
+class ArticleStore:
+    """Interfața comună pentru stocarea articolelor.
+
+    Articolele sunt dicționare cu cheile din ARTICLE_FIELDS. Perechea
+    (title, link) este unică: inserările duplicate sunt ignorate.
+    """
+
+    def init(self):
+        """Pregătește stocarea (creează schema dacă e nevoie)."""
+        raise NotImplementedError
+
+    def insert_batch(self, articles, on_error=None):
+        """Inserează un lot de articole; returnează lista celor noi (cu 'id' completat)."""
+        raise NotImplementedError
+
+    def latest(self, limit=50, offset=0):
+        """Cele mai noi articole, paginat."""
+        raise NotImplementedError
+
+    def since(self, cursor, limit=500):
+        """Articolele cu id > cursor, în ordine crescătoare."""
+        raise NotImplementedError
+
+    def timeline(self, limit=50, before=None, before_id=None):
+        """Cele mai recente articole după data publicării (published_ts), din toate sursele.
+
+        Ordinea este (published_ts, id) descrescător. Pagina următoare se cere cu
+        cursorul ultimului articol: `before`=published_ts și `before_id`=id (articolele
+        cu aceeași dată nu sunt sărite). Doar cu `before` se întorc articolele
+        publicate strict înainte de acel moment.
+        """
+        raise NotImplementedError
+
+    def search(self, query, limit=50):
+        """Caută textul în titlu și rezumat (cele mai noi primele)."""
+        raise NotImplementedError
+
+    def set_clusters(self, assignments):
+        """Salvează perechile (id, cluster_id) calculate la ingestie."""
+        raise NotImplementedError
+
+    def apply_retention(self, max_articles):
+        """Păstrează doar cele mai noi `max_articles` articole; returnează câte au fost șterse."""
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def describe(self, limit=5):
+        """Returnează {tabel: primele `limit` rânduri} pentru inspectare."""
+        raise NotImplementedError
+
+    def load_health(self):
+        """Starea de sănătate salvată a feed-urilor: {url: dicționar cu HEALTH_FIELDS}."""
+        raise NotImplementedError
+
+    def save_health(self, record):
+        """Salvează (înlocuiește) starea de sănătate a unui feed."""
+        raise NotImplementedError
+
+    def load_feed_state(self):
+        """Starea de planificare salvată a feed-urilor: {url: dicționar cu FEED_STATE_FIELDS}."""
+        raise NotImplementedError
+
+    def save_feed_state(self, records):
+        """Salvează (înlocuiește) starea de planificare a feed-urilor date."""
+        raise NotImplementedError
+
+    def load_filters(self):
+        """Filtrele de abonament salvate: {nume: reguli}."""
+        raise NotImplementedError
+
+    def save_filter(self, name, rules):
+        """Salvează (înlocuiește) regulile unui filtru."""
+        raise NotImplementedError
+
+    def delete_filter(self, name):
+        raise NotImplementedError
+
+
+def _row_to_article(row):
+    return dict(zip(ARTICLE_FIELDS, row))
+
+
+class SQLiteStore(ArticleStore):
+    """Stocare implicită într-un fișier SQLite (o conexiune per operație)."""
+
+    _insert_sql = (f"INSERT OR IGNORE INTO articles ({', '.join(INSERT_FIELDS)}) "
+                   f"VALUES ({', '.join('?' for _ in INSERT_FIELDS)})")
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+
+    def connect(self, read_only=False):
+        if read_only:
+            # Fără creare de fișier sau scrieri accidentale (ex: pentru inspect_db.py)
+            return sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True)
+        return sqlite3.connect(self.db_file)
+
+    def init(self):
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT,
+                link TEXT,
+                published TEXT,
+                source TEXT,
+                description TEXT,
+                published_ts INTEGER,
+                cluster_id INTEGER,
+                summary TEXT,
+                UNIQUE(title, link)
+            )''')
+            self._migrate(conn)
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_articles_published_ts
+                            ON articles(published_ts)''')
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_articles_cluster_id
+                            ON articles(cluster_id)''')
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_articles_source_published_ts
+                            ON articles(source, published_ts)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS feed_health (
+                url TEXT PRIMARY KEY,
+                name TEXT,
+                state TEXT,
+                consecutive_failures INTEGER,
+                last_success REAL,
+                last_failure REAL,
+                avg_latency REAL,
+                last_status INTEGER,
+                last_error TEXT,
+                open_until REAL
+            )''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS feed_state (
+                url TEXT PRIMARY KEY,
+                last_fetch REAL,
+                etag TEXT,
+                last_modified TEXT
+            )''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS filters (
+                name TEXT PRIMARY KEY,
+                rules TEXT
+            )''')
+            conn.commit()
+
+    def _migrate(self, conn):
+        """Adaugă coloanele noi în bazele de date create de versiuni mai vechi."""
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+        if 'published_ts' not in existing:
+            print("Migrez baza de date: adaug coloana published_ts...")
+            conn.execute("ALTER TABLE articles ADD COLUMN published_ts INTEGER")
+            rows = conn.execute("SELECT id, published FROM articles").fetchall()
+            conn.executemany("UPDATE articles SET published_ts = ? WHERE id = ?",
+                             [(parse_published(published), article_id) for article_id, published in rows])
+        if 'cluster_id' not in existing:
+            # Articolele existente rămân fiecare în propriul cluster
+            print("Migrez baza de date: adaug coloana cluster_id...")
+            conn.execute("ALTER TABLE articles ADD COLUMN cluster_id INTEGER")
+            conn.execute("UPDATE articles SET cluster_id = id")
+        if 'summary' not in existing:
+            print("Migrez baza de date: adaug coloana summary...")
+            conn.execute("ALTER TABLE articles ADD COLUMN summary TEXT")
+            rows = conn.execute("SELECT id, description FROM articles").fetchall()
+            conn.executemany("UPDATE articles SET summary = ? WHERE id = ?",
+                             [(summarize(description), article_id) for article_id, description in rows])
+
+    def columns(self, table='articles'):
+        """Returnează lista (nume, tip) a coloanelor unui tabel."""
+        with self.connect() as conn:
+            rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+        return [(row[1], row[2]) for row in rows]
+
+    def missing_columns(self):
+        """Coloanele din ARTICLE_FIELDS care lipsesc (bază de date nemigrată încă de `init`)."""
+        with self.connect(read_only=True) as conn:
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+        return [field for field in ARTICLE_FIELDS if field not in existing]
+
+    def iter_articles(self, sources=None, since=None, until=None, chunk_size=1000):
+        """Parcurge articolele în loturi de `chunk_size`, ordonate după published_ts.
+
+        Rândurile sunt citite incremental din cursor (fetchmany), deci memoria
+        folosită nu depinde de mărimea tabelei. Filtrele pe sursă și interval
+        (epoch, `since` inclusiv, `until` exclusiv) folosesc indexurile.
+        """
+        conditions, params = [], []
+        if sources:
+            conditions.append(f"source IN ({', '.join('?' for _ in sources)})")
+            params.extend(sources)
+        if since is not None:
+            conditions.append("published_ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("published_ts < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        conn = self.connect(read_only=True)
+        try:
+            cursor = conn.execute(f"{SELECT_ARTICLES}{where} ORDER BY published_ts, id", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [_row_to_article(row) for row in rows]
+        finally:
+            conn.close()
+
+    def count_by_source(self):
+        """Lista (sursă, articole, primul published_ts, ultimul published_ts)."""
+        with self.connect(read_only=True) as conn:
+            return conn.execute('''SELECT source, COUNT(*), MIN(published_ts), MAX(published_ts)
+                                   FROM articles GROUP BY source ORDER BY COUNT(*) DESC''').fetchall()
+
+    def table_stats(self):
+        """Dimensiunea tabelelor și indexurilor: listă (nume, tip, rânduri, octeți).
+
+        Octeții vin din tabela virtuală dbstat; dacă SQLite nu o are, sunt None.
+        """
+        with self.connect(read_only=True) as conn:
+            objects = conn.execute('''SELECT name, type, tbl_name FROM sqlite_master
+                                      WHERE type IN ('table', 'index') ORDER BY tbl_name, type DESC, name''').fetchall()
+            try:
+                sizes = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall())
+            except sqlite3.OperationalError:
+                sizes = {}
+            result = []
+            for name, kind, table in objects:
+                rows = None
+                if kind == 'table':
+                    rows = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+                result.append((name, kind, rows, sizes.get(name)))
+        return result
+
+    def insert_batch(self, articles, on_error=None):
+        new_articles = []
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            for article in articles:
+                try:
+                    cursor.execute(self._insert_sql,
+                                   tuple(article.get(field) for field in INSERT_FIELDS))
+                    if cursor.rowcount > 0:
+                        new_articles.append(dict(article, id=cursor.lastrowid))
+                except Exception as e:
+                    if on_error:
+                        on_error(e)
+                    print(f"Eroare la inserarea articolului: {e}")
+            conn.commit()
+        return new_articles
+
+    def latest(self, limit=50, offset=0):
+        with self.connect() as conn:
+            rows = conn.execute(f"{SELECT_ARTICLES} ORDER BY id DESC LIMIT ? OFFSET ?",
+                                (limit, offset)).fetchall()
+        return [_row_to_article(row) for row in rows]
+
+    def timeline(self, limit=50, before=None, before_id=None):
+        with self.connect() as conn:
+            if before is None:
+                rows = conn.execute(f"{SELECT_ARTICLES} ORDER BY published_ts DESC, id DESC LIMIT ?",
+                                    (limit,)).fetchall()
+            elif before_id is not None:
+                rows = conn.execute(f"""{SELECT_ARTICLES}
+                                     WHERE published_ts < ? OR (published_ts = ? AND id < ?)
+                                     ORDER BY published_ts DESC, id DESC LIMIT ?""",
+                                    (before, before, before_id, limit)).fetchall()
+            else:
+                rows = conn.execute(f"""{SELECT_ARTICLES} WHERE published_ts < ?
+                                     ORDER BY published_ts DESC, id DESC LIMIT ?""",
+                                    (before, limit)).fetchall()
+        return [_row_to_article(row) for row in rows]
+
+    def since(self, cursor, limit=500):
+        with self.connect() as conn:
+            rows = conn.execute(f"{SELECT_ARTICLES} WHERE id > ? ORDER BY id LIMIT ?",
+                                (cursor, limit)).fetchall()
+        return [_row_to_article(row) for row in rows]
+
+    def search(self, query, limit=50):
+        pattern = f"%{query}%"
+        with self.connect() as conn:
+            rows = conn.execute(f"""{SELECT_ARTICLES} WHERE title LIKE ? OR summary LIKE ?
+                                 ORDER BY id DESC LIMIT ?""",
+                                (pattern, pattern, limit)).fetchall()
+        return [_row_to_article(row) for row in rows]
+
+    def set_clusters(self, assignments):
+        with self.connect() as conn:
+            conn.executemany("UPDATE articles SET cluster_id = ? WHERE id = ?",
+                             [(cluster_id, article_id) for article_id, cluster_id in assignments])
+            conn.commit()
+
+    def apply_retention(self, max_articles):
+        with self.connect() as conn:
+            cursor = conn.execute('''DELETE FROM articles WHERE id <= (
+                                       SELECT id FROM articles ORDER BY id DESC LIMIT 1 OFFSET ?)''',
+                                  (max_articles,))
+            conn.commit()
+            return cursor.rowcount
+
+    def count(self):
+        with self.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def describe(self, limit=5):
+        result = {}
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+            for table_name, in cursor.fetchall():
+                cursor.execute(f"SELECT * FROM {table_name} LIMIT ?", (limit,))
+                result[table_name] = cursor.fetchall()
+        return result
+
+    def load_health(self):
+        with self.connect() as conn:
+            rows = conn.execute(f"SELECT {', '.join(HEALTH_FIELDS)} FROM feed_health").fetchall()
+        return {row[0]: dict(zip(HEALTH_FIELDS, row)) for row in rows}
+
+    def save_health(self, record):
+        placeholders = ', '.join('?' for _ in HEALTH_FIELDS)
+        with self.connect() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO feed_health ({', '.join(HEALTH_FIELDS)}) "
+                         f"VALUES ({placeholders})",
+                         tuple(record.get(field) for field in HEALTH_FIELDS))
+            conn.commit()
+
+    def load_feed_state(self):
+        with self.connect() as conn:
+            rows = conn.execute(f"SELECT {', '.join(FEED_STATE_FIELDS)} FROM feed_state").fetchall()
+        return {row[0]: dict(zip(FEED_STATE_FIELDS, row)) for row in rows}
+
+    def save_feed_state(self, records):
+        placeholders = ', '.join('?' for _ in FEED_STATE_FIELDS)
+        with self.connect() as conn:
+            conn.executemany(f"INSERT OR REPLACE INTO feed_state ({', '.join(FEED_STATE_FIELDS)}) "
+                             f"VALUES ({placeholders})",
+                             [tuple(record.get(field) for field in FEED_STATE_FIELDS) for record in records])
+            conn.commit()
+
+    def load_filters(self):
+        with self.connect() as conn:
+            rows = conn.execute("SELECT name, rules FROM filters").fetchall()
+        return {name: json.loads(rules) for name, rules in rows}
+
+    def save_filter(self, name, rules):
+        with self.connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO filters (name, rules) VALUES (?, ?)",
+                         (name, json.dumps(rules, ensure_ascii=False)))
+            conn.commit()
+
+    def delete_filter(self, name):
+        with self.connect() as conn:
+            conn.execute("DELETE FROM filters WHERE name = ?", (name,))
+            conn.commit()
+
+
+class MemoryStore(ArticleStore):
+    """Stocare în memorie sub formă de ring buffer: cele mai vechi articole sunt eliminate
+    când se atinge capacitatea. Citirile nu ating discul."""
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self._articles = deque()
+        self._keys = set()
+        self._by_id = {}
+        self._next_id = 1
+        self._health = {}
+        self._feed_state = {}
+        self._filters = {}
+        self._lock = threading.Lock()
+
+    def init(self):
+        pass
+
+    def _evict(self, keep):
+        removed = 0
+        while len(self._articles) > keep:
+            old = self._articles.popleft()
+            self._keys.discard((old['title'], old['link']))
+            self._by_id.pop(old['id'], None)
+            removed += 1
+        return removed
+
+    def insert_batch(self, articles, on_error=None):
+        new_articles = []
+        with self._lock:
+            for article in articles:
+                try:
+                    key = (article['title'], article['link'])
+                    if key in self._keys:
+                        continue
+                    stored = {field: article.get(field) for field in ARTICLE_FIELDS}
+                    stored['id'] = self._next_id
+                    self._next_id += 1
+                    self._articles.append(stored)
+                    self._keys.add(key)
+                    self._by_id[stored['id']] = stored
+                    new_articles.append(stored)
+                except Exception as e:
+                    if on_error:
+                        on_error(e)
+                    print(f"Eroare la inserarea articolului: {e}")
+            self._evict(self.capacity)
+        return [dict(article) for article in new_articles]
+
+    def latest(self, limit=50, offset=0):
+        with self._lock:
+            end = len(self._articles) - offset
+            start = max(0, end - limit)
+            if end <= 0:
+                return []
+            return [dict(self._articles[i]) for i in range(end - 1, start - 1, -1)]
+
+    def timeline(self, limit=50, before=None, before_id=None):
+        key = lambda article: (article['published_ts'] or 0, article['id'])
+        if before is None:
+            cursor = None
+        elif before_id is None:
+            cursor = (before, 0)
+        else:
+            cursor = (before, before_id)
+        with self._lock:
+            candidates = (article for article in self._articles
+                          if cursor is None or key(article) < cursor)
+            top = heapq.nlargest(limit, candidates, key=key)
+        return [dict(article) for article in top]
+
+    def since(self, cursor, limit=500):
+        with self._lock:
+            # Parcurge de la coadă până la cursor; id-urile sunt crescătoare
+            result = []
+            for article in reversed(self._articles):
+                if article['id'] <= cursor:
+                    break
+                result.append(article)
+            result.reverse()
+            return [dict(article) for article in result[:limit]]
+
+    def search(self, query, limit=50):
+        needle = query.lower()
+        result = []
+        with self._lock:
+            for article in reversed(self._articles):
+                if needle in (article['title'] or '').lower() or needle in (article['summary'] or '').lower():
+                    result.append(dict(article))
+                    if len(result) >= limit:
+                        break
+        return result
+
+    def set_clusters(self, assignments):
+        with self._lock:
+            for article_id, cluster_id in assignments:
+                article = self._by_id.get(article_id)
+                if article is not None:
+                    article['cluster_id'] = cluster_id
+
+    def apply_retention(self, max_articles):
+        with self._lock:
+            return self._evict(max_articles)
+
+    def count(self):
+        with self._lock:
+            return len(self._articles)
+
+    def describe(self, limit=5):
+        with self._lock:
+            rows = [tuple(article[field] for field in ARTICLE_FIELDS)
+                    for article in list(self._articles)[:limit]]
+        return {'articles': rows}
+
+    def load_health(self):
+        with self._lock:
+            return {url: dict(record) for url, record in self._health.items()}
+
+    def save_health(self, record):
+        with self._lock:
+            self._health[record['url']] = {field: record.get(field) for field in HEALTH_FIELDS}
+
+    def load_feed_state(self):
+        with self._lock:
+            return {url: dict(record) for url, record in self._feed_state.items()}
+
+    def save_feed_state(self, records):
+        with self._lock:
+            for record in records:
+                self._feed_state[record['url']] = {field: record.get(field) for field in FEED_STATE_FIELDS}
+
+    def load_filters(self):
+        with self._lock:
+            return dict(self._filters)
+
+    def save_filter(self, name, rules):
+        with self._lock:
+            self._filters[name] = rules
+
+    def delete_filter(self, name):
+        with self._lock:
+            self._filters.pop(name, None)
+
+
+def create_store(settings, db_file):
+    """Creează backend-ul de stocare ales în setări ('sqlite' implicit sau 'memory')."""
+    backend = settings.get('storage_backend', 'sqlite')
+    if backend == 'memory':
+        return MemoryStore(settings.get('memory_capacity', 10000))
+    if backend == 'sqlite':
+        return SQLiteStore(db_file)
+    raise ValueError(f"Backend de stocare necunoscut: {backend}")
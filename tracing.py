@@ -0,0 +1,173 @@
+"""Urmărirea etapelor ciclului de actualizare și profilarea la cerere.
+
+Tracer scrie câte un eveniment per etapă (span) în formatul Chrome trace:
+o linie JSON per eveniment, după un '[' inițial, deci fișierul poate fi
+citit linie cu linie sau deschis direct în chrome://tracing / Perfetto.
+Când fișierul depășește `max_bytes` este redenumit în `<fișier>.1` și se
+începe unul nou. Când urmărirea e oprită, `span()` întoarce un obiect gol
+comun, fără alocări și fără scrieri.
+
+Profiler rulează cProfile pe următoarele N cicluri și salvează statisticile
+(fișier .prof pentru pstats/snakeviz și un rezumat text).
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start_us', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start_us = time.time_ns() // 1000
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = (time.perf_counter_ns() - self.start) // 1000
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.write({'name': self.name, 'cat': 'update', 'ph': 'X', 'ts': self.start_us,
+                           'dur': duration, 'pid': os.getpid(), 'tid': threading.get_ident(),
+                           'args': self.args})
+        return False
+
+
+class Tracer:
+    """Evenimente per etapă într-un fișier local care se rotește la `max_bytes`."""
+
+    def __init__(self, path='rss_trace.json', max_bytes=10 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = False
+        self._file = None
+        self._lock = threading.Lock()
+
+    def span(self, name, **args):
+        """Context pentru o etapă: `with tracer.span('parse', feed=nume): ...`."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def _open(self):
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self._file.tell() == 0:
+            self._file.write('[\n')
+
+    def write(self, event):
+        line = json.dumps(event, ensure_ascii=False) + ',\n'
+        with self._lock:
+            if not self.enabled:
+                return
+            if self._file is None:
+                self._open()
+            if self._file.tell() + len(line) > self.max_bytes:
+                self._file.close()
+                os.replace(self.path, self.path + '.1')
+                self._open()
+            self._file.write(line)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def set_enabled(self, enabled):
+        """Pornește/oprește urmărirea; returnează starea nouă."""
+        with self._lock:
+            self.enabled = enabled
+            if not enabled and self._file is not None:
+                self._file.close()
+                self._file = None
+        return enabled
+
+
+class Profiler:
+    """cProfile pe următoarele N cicluri de actualizare, cerut la rulare."""
+
+    def __init__(self, output_dir='.', top=40):
+        self.output_dir = output_dir
+        self.top = top
+        self.remaining = 0
+        self.last_output = None
+        self._profile = None
+        self._cycles = 0
+        self._lock = threading.Lock()
+
+    def request(self, cycles=1):
+        """Programează profilarea următoarelor `cycles` cicluri."""
+        with self._lock:
+            self.remaining = max(1, int(cycles))
+        return self.remaining
+
+    def cycle(self):
+        """Context în jurul unui ciclu; profilează doar dacă a fost cerut."""
+        if not self.remaining:
+            return _NULL_SPAN
+        return _ProfiledCycle(self)
+
+    def _start(self):
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._cycles = 0
+        self._profile.enable()
+
+    def _stop(self):
+        self._profile.disable()
+        self._cycles += 1
+        with self._lock:
+            self.remaining = max(0, self.remaining - 1)
+            finished = self.remaining == 0
+        if finished:
+            self._dump()
+
+    def _dump(self):
+        profile, self._profile = self._profile, None
+        base = os.path.join(self.output_dir, time.strftime('profile-%Y%m%d-%H%M%S'))
+        profile.dump_stats(base + '.prof')
+
+        summary = io.StringIO()
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(f"Cicluri profilate: {self._cycles}\n")
+            f.write(summary.getvalue())
+        self.last_output = base
+        print(f"Profil salvat: {base}.prof ({self._cycles} cicluri), rezumat în {base}.txt")
+
+
+class _ProfiledCycle:
+    __slots__ = ('profiler',)
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def __enter__(self):
+        self.profiler._start()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._stop()
+        return False
@@ -0,0 +1,172 @@
+"""Worker de preluare pentru modul coordonator/worker.
+
+Worker-ul se înregistrează la coordonator (python server.py --coordinator),
+primește shard-ul său de feed-uri (hashing consistent după URL), le descarcă
+și trimite articolele parsate înapoi prin comanda INGEST, iar starea
+feed-urilor (eșecuri, latență, circuit breaker) prin REPORT_HEALTH.
+
+Exemplu (mai multe procese pe aceeași mașină):
+    python server.py --coordinator
+    python worker.py --id worker-1
+    python worker.py --id worker-2
+
+Worker-ii de pe alte mașini sunt acceptați doar cu secretul din setarea
+'worker_secret' a coordonatorului:
+    RSS_WORKER_SECRET=... python worker.py --coordinator 10.0.0.1:5000
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+import server
+from protocol import send_request
+
+
+class Worker:
+    """Descarcă feed-urile din shard-ul primit de la coordonator."""
+
+    def __init__(self, host, port, worker_id, heartbeat_interval=10, secret=None):
+        self.host = host
+        self.port = port
+        self.worker_id = worker_id
+        self.secret = secret
+        self.heartbeat_interval = heartbeat_interval
+        self.feeds = []
+        self.settings = {}
+        self.last_fetch = {}
+        self.last_heartbeat = 0
+
+    def _command(self, name):
+        # Secretul (setarea 'worker_secret' a coordonatorului) autentifică worker-ul
+        return f"{name} {self.worker_id} {self.secret}" if self.secret else f"{name} {self.worker_id}"
+
+    def heartbeat(self):
+        """Se anunță la coordonator și actualizează shard-ul local."""
+        response = send_request(self.host, self.port, self._command("REGISTER_WORKER"))
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+
+        urls = {feed['url'] for feed in response['feeds']}
+        old_urls = {feed['url'] for feed in self.feeds}
+        if urls != old_urls:
+            print(f"Shard nou ({response['workers']} worker-i): {len(urls)} feed-uri")
+
+        # Uită feed-urile mutate la alți worker-i
+        for url in list(self.last_fetch):
+            if url not in urls:
+                del self.last_fetch[url]
+
+        self.feeds = response['feeds']
+        self.settings = response['settings']
+        self.last_heartbeat = time.time()
+
+    def push(self, feed_name, batch, attempts=3):
+        """Trimite lotul la coordonator; returnează True dacă a fost salvat.
+
+        Răspunsurile "ocupat" și erorile de conexiune sunt reîncercate după
+        `retry_after`; orice altă eroare înseamnă că lotul nu a fost salvat.
+        """
+        body = {'worker': self.worker_id, 'secret': self.secret, 'feed': feed_name, 'articles': batch}
+        for attempt in range(attempts):
+            try:
+                response = send_request(self.host, self.port, "INGEST", body)
+            except (OSError, ValueError) as e:
+                response = {'error': str(e), 'busy': True}
+            if 'error' not in response:
+                print(f"Trimise {len(batch)} articole de la {feed_name}: {response.get('inserted', 0)} noi")
+                return True
+            if not response.get('busy') or attempt == attempts - 1:
+                break
+            time.sleep(response.get('retry_after', 1))
+        print(f"Lotul de la {feed_name} nu a fost salvat ({response['error']}); reîncerc la ciclul următor")
+        return False
+
+    def report_health(self, urls):
+        """Trimite coordonatorului starea feed-urilor descărcate (pentru GET_HEALTH)."""
+        records = [record for record in map(server.health.get, urls) if record is not None]
+        if not records:
+            return
+        body = {'worker': self.worker_id, 'secret': self.secret, 'feeds': records}
+        try:
+            response = send_request(self.host, self.port, "REPORT_HEALTH", body)
+        except (OSError, ValueError) as e:
+            response = {'error': str(e)}
+        if 'error' in response:
+            print(f"Starea feed-urilor nu a ajuns la coordonator: {response['error']}")
+
+    def run_once(self):
+        """Descarcă feed-urile scadente din shard."""
+        interval = self.settings.get('update_interval', 300)
+        fetched = []
+        for feed in list(self.feeds):
+            # Reîmprospătează shard-ul în timpul ciclurilor lungi
+            if time.time() - self.last_heartbeat >= self.heartbeat_interval:
+                self.heartbeat()
+                if feed['url'] not in {f['url'] for f in self.feeds}:
+                    continue
+
+            if time.time() - self.last_fetch.get(feed['url'], 0) < interval:
+                continue
+            if not server.health.allow(feed['url']):
+                continue  # Circuit deschis: feed-ul este în pauză
+            fetched.append(feed['url'])
+            try:
+                batch, validators = server.fetch_articles(feed, self.settings)
+                if batch and not self.push(feed['name'], batch):
+                    continue  # Feed-ul rămâne scadent până când lotul ajunge la coordonator
+                # Cererea următoare e condiționată doar după ce lotul a fost salvat
+                server.commit_validators(feed['url'], validators)
+            except Exception as e:
+                print(f"Eroare la procesarea feed-ului {feed.get('name', 'necunoscut')}: {e}")
+            self.last_fetch[feed['url']] = time.time()
+        self.report_health(fetched)
+
+    def run(self):
+        print(f"Worker {self.worker_id} conectat la {self.host}:{self.port}")
+        try:
+            while True:
+                try:
+                    self.heartbeat()
+                    self.run_once()
+                except (OSError, ValueError, RuntimeError) as e:
+                    print(f"Eroare de comunicare cu coordonatorul: {e}")
+                time.sleep(self.heartbeat_interval)
+        finally:
+            try:
+                send_request(self.host, self.port, self._command("UNREGISTER_WORKER"), timeout=5)
+            except (OSError, ValueError):
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de preluare feed-uri")
+    parser.add_argument('--coordinator', default=f"127.0.0.1:{server.PORT}",
+                        help="adresa coordonatorului (host:port)")
+    parser.add_argument('--id', default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="identificatorul unic al worker-ului")
+    parser.add_argument('--heartbeat', type=float, default=10, help="intervalul de heartbeat (s)")
+    parser.add_argument('--secret', default=os.environ.get('RSS_WORKER_SECRET'),
+                        help="secretul comun cu coordonatorul (setarea worker_secret; implicit din "
+                             "variabila de mediu RSS_WORKER_SECRET)")
+    args = parser.parse_args()
+
+    host, _, port = args.coordinator.rpartition(':')
+
+    # La SIGTERM worker-ul se deconectează curat (rebalansare imediată)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    # Dezactivează warnings pentru SSL
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    Worker(host, int(port), args.id, args.heartbeat, args.secret).run()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nWorker oprit.")